@@ -0,0 +1,322 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import NamedTuple, List, Callable, Dict, Iterator, Tuple
+
+import numpy as np
+
+from engine.auto_wordle_engine import PredefinedWordleSession, MaxTriesExceededError
+from engine.feedback import create_feedback
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import WordleSessionEngine, GuessFeedback
+from solver.candidates import CandidateSet
+from solver.constraints import Constraints
+from solver.endgame_solver import EndgameSolver
+from solver.entropy.letters_stats import sort_by_info_gain
+from solver.entropy.partition_entropy import rank_by_partition_entropy
+from solver.entropy.two_stage_ranking import TwoStageRanker
+from solver.letters_index import LettersIndex
+from solver.simplified_entropy_solver import SimplifiedEntropySolver
+from utils import load_words, load_wordslist
+
+ALLOWED_WORDS_PATH = "resources/allowed_words.txt"
+POSSIBLE_ANSWERS_PATH = "resources/possible_words.txt"
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_SEED = 1919
+PERCENTILES = (50, 90, 99)
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    n_ops: int
+    total_seconds: float
+    latencies: List[float]
+    # the size of the tables the benchmark built, if any
+    memory_bytes: int = 0
+
+    def summary(self) -> Dict[str, float]:
+        latencies_ms = np.array(self.latencies) * 1000
+        summary = {"n_ops": self.n_ops, "throughput": self.n_ops / self.total_seconds}
+        for percentile in PERCENTILES:
+            summary[f"p{percentile}_ms"] = float(np.percentile(latencies_ms, percentile))
+        if self.memory_bytes > 0:
+            summary["memory_bytes"] = self.memory_bytes
+
+        return summary
+
+
+class Corpus(NamedTuple):
+    name: str
+    guesses: List[str]
+    answers: List[str]
+
+
+class TimedSession(WordleSessionEngine):
+    # records the time the solver took to come up with every guess (the time since the previous feedback)
+
+    def __init__(self, session: PredefinedWordleSession):
+        self.session = session
+        self.turns_latencies: List[float] = []
+        self.__last_feedback_time = time.perf_counter()
+
+    def guess(self, word: str) -> GuessFeedback:
+        self.turns_latencies.append(time.perf_counter() - self.__last_feedback_time)
+        feedback = self.session.guess(word)
+        self.__last_feedback_time = time.perf_counter()
+        return feedback
+
+    def is_solved(self) -> bool:
+        return self.session.is_solved()
+
+
+def create_synthetic_words(n_words: int, rng: random.Random, word_len: int = 5) -> List[str]:
+    # letters are drawn by their english frequency, so the synthetic words look like the real ones to the solvers
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    weights = [len(letters) - i for i in range(len(letters))]
+    words = set()
+    while len(words) < n_words:
+        words.add("".join(rng.choices(letters, weights, k=word_len)))
+
+    return sorted(words)
+
+
+def create_corpora(sizes: List[int], rng: random.Random, word_lens: List[int]) -> List[Corpus]:
+    allowed_words = list(load_words(ALLOWED_WORDS_PATH))
+    possible_answers = load_wordslist(POSSIBLE_ANSWERS_PATH)
+    corpora = [Corpus("real", allowed_words, possible_answers)]
+    for size in sizes:
+        words = create_synthetic_words(size, rng)
+        corpora.append(Corpus(f"synthetic-{size}", words, rng.sample(words, max(1, size // 5))))
+
+    # the other word lengths are benchmarked on the largest synthetic corpus size
+    size = max(sizes, default=2000)
+    for word_len in word_lens:
+        words = create_synthetic_words(size, rng, word_len)
+        corpora.append(Corpus(f"synthetic-{size}-len{word_len}", words, rng.sample(words, max(1, size // 5))))
+
+    return corpora
+
+
+def iter_random_constraints(corpus: Corpus, rng: random.Random, n_states: int) -> Iterator[Tuple[Constraints, str, GuessFeedback]]:
+    # random game states: the constraints so far, and the next guess with its feedback
+    for _ in range(n_states):
+        target = rng.choice(corpus.answers)
+        constraints = Constraints.create_empty()
+        for _ in range(rng.randint(0, 3)):
+            guess = rng.choice(corpus.guesses)
+            constraints = constraints.update(guess, create_feedback(guess, target).pattern)
+
+        guess = rng.choice(corpus.guesses)
+        yield constraints, guess, create_feedback(guess, target)
+
+
+def time_calls(name: str, calls: List[Callable[[], object]]) -> BenchmarkResult:
+    latencies = []
+    start = time.perf_counter()
+    for call in calls:
+        call_start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - call_start)
+
+    return BenchmarkResult(name, len(calls), time.perf_counter() - start, latencies)
+
+
+def bench_create_feedback(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    pairs = [(rng.choice(corpus.guesses), rng.choice(corpus.answers)) for _ in range(n_ops)]
+    latencies = []
+    start = time.perf_counter()
+    for guess, target in pairs:
+        call_start = time.perf_counter()
+        create_feedback(guess, target)
+        latencies.append(time.perf_counter() - call_start)
+
+    return BenchmarkResult(f"create_feedback/{corpus.name}", n_ops, time.perf_counter() - start, latencies)
+
+
+def bench_filter_words(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    calls = [lambda c=constraints: list(c.filter_words(corpus.guesses)) for constraints, _, _ in states]
+    return time_calls(f"constraints_filter_words/{corpus.name}", calls)
+
+
+def bench_update(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    calls = [lambda c=constraints, f=feedback: c.update(f.word, f.pattern) for constraints, _, feedback in states]
+    return time_calls(f"constraints_update/{corpus.name}", calls)
+
+
+def bench_sort_by_info_gain(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    remained = [constraints.select_words(corpus.guesses) or corpus.guesses for constraints, _, _ in states]
+    calls = [lambda words=words: sort_by_info_gain(corpus.guesses, words) for words in remained]
+    return time_calls(f"sort_by_info_gain/{corpus.name}", calls)
+
+
+def bench_two_stage_ranking(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    # the dictionary fallback of `sort_by_info_gain`, with a pre-screen
+    ranker = TwoStageRanker(corpus.guesses)
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    remained = [constraints.select_words(corpus.guesses) or corpus.guesses for constraints, _, _ in states]
+    calls = [lambda words=words: next(iter(ranker.rank(words).ranking)) for words in remained]
+    return time_calls(f"two_stage_ranking/{corpus.name}", calls)
+
+
+def bench_patterns_matrix(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    patterns = None
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(n_ops):
+        call_start = time.perf_counter()
+        patterns = PatternMatrix.compute(corpus.guesses, corpus.answers)
+        latencies.append(time.perf_counter() - call_start)
+
+    return BenchmarkResult(f"patterns_matrix/{corpus.name}", n_ops, time.perf_counter() - start, latencies,
+                           patterns.matrix.nbytes)
+
+
+def bench_partition_entropy(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    patterns = PatternMatrix.compute(corpus.guesses, corpus.answers)
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    remained = [[patterns.answers_index[word] for word in constraints.filter_words(corpus.answers)]
+                for constraints, _, _ in states]
+    remained = [indices or list(range(len(corpus.answers))) for indices in remained]
+    calls = [lambda indices=indices: next(iter(rank_by_partition_entropy(patterns, indices))) for indices in remained]
+    return time_calls(f"partition_entropy/{corpus.name}", calls)
+
+
+def bench_endgame(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    # random endgames, searched by the same solver (the memo is shared by the calls)
+    patterns = PatternMatrix.compute(corpus.guesses, corpus.answers)
+    initial_candidates = CandidateSet.from_patterns(patterns)
+    endgame = EndgameSolver(patterns.guesses, initial_candidates)
+    endgames = []
+    for _ in range(n_ops):
+        target = rng.choice(corpus.answers)
+        candidates = initial_candidates
+        while not endgame.applies(candidates):
+            guess = rng.choice(corpus.guesses)
+            candidates = candidates.narrow(guess, patterns.pattern(guess, target))
+        endgames.append(candidates)
+
+    calls = [lambda c=candidates: endgame.best_guess(c) for candidates in endgames]
+    return time_calls(f"endgame/{corpus.name}", calls)
+
+
+def bench_letters_index(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    index = LettersIndex.create(corpus.guesses)
+    memory_bytes = index.position_bitsets.nbytes + index.count_bitsets.nbytes
+    states = list(iter_random_constraints(corpus, rng, n_ops))
+    calls = [lambda c=constraints: index.select_indices(c) for constraints, _, _ in states]
+    result = time_calls(f"letters_index_select/{corpus.name}", calls)
+    return result._replace(memory_bytes=memory_bytes)
+
+
+def bench_solve(corpus: Corpus, rng: random.Random, n_ops: int) -> BenchmarkResult:
+    solver = SimplifiedEntropySolver(corpus.guesses, max_guesses=6)
+    targets = [rng.choice(corpus.answers) for _ in range(n_ops)]
+    turns_latencies = []
+    start = time.perf_counter()
+    for target in targets:
+        session = TimedSession(PredefinedWordleSession(target, 6))
+        try:
+            solver.solve(session)
+        except MaxTriesExceededError:
+            pass
+        turns_latencies.extend(session.turns_latencies)
+
+    return BenchmarkResult(f"solve/{corpus.name}", n_ops, time.perf_counter() - start, turns_latencies)
+
+
+# benchmark, and the number of operations it runs in a full run
+BENCHMARKS: List[Tuple[Callable[[Corpus, random.Random, int], BenchmarkResult], int]] = [
+    (bench_create_feedback, 20000),
+    (bench_filter_words, 20),
+    (bench_update, 2000),
+    (bench_sort_by_info_gain, 20),
+    (bench_two_stage_ranking, 20),
+    (bench_patterns_matrix, 1),
+    (bench_partition_entropy, 20),
+    (bench_endgame, 20),
+    (bench_letters_index, 200),
+    (bench_solve, 20),
+]
+
+
+def run_benchmarks(sizes: List[int], scale: float, seed: int, word_lens: List[int]) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    results = {}
+    for corpus in create_corpora(sizes, rng, word_lens):
+        for benchmark, n_ops in BENCHMARKS:
+            result = benchmark(corpus, random.Random(seed), max(1, int(n_ops * scale)))
+            results[result.name] = result.summary()
+            print(format_summary(result.name, results[result.name]), file=sys.stderr)
+
+    return results
+
+
+def format_summary(name: str, summary: Dict[str, float]) -> str:
+    percentiles = " ".join(f"p{p}={summary[f'p{p}_ms']:.3f}ms" for p in PERCENTILES)
+    memory = f"  {summary['memory_bytes'] / 1024:.1f}KB" if "memory_bytes" in summary else ""
+    return f"{name:45s} {summary['throughput']:12.1f} ops/s  {percentiles}{memory}"
+
+
+def compare_results(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]],
+                    threshold: float) -> List[str]:
+    # a benchmark regresses when its throughput drops, or its median latency grows, by more than the threshold
+    regressions = []
+    for name, summary in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        throughput_change = (summary["throughput"] / base["throughput"]) - 1
+        latency_change = (summary["p50_ms"] / base["p50_ms"]) - 1 if base["p50_ms"] > 0 else 0
+        if (throughput_change < -threshold) or (latency_change > threshold):
+            regressions.append(f"{name}: throughput {throughput_change:+.1%}, p50 latency {latency_change:+.1%}")
+
+    return regressions
+
+
+def create_metadata(seed: int, scale: float) -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "scale": scale,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the solver hot paths")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[500, 2000, 8000], help="synthetic corpora sizes")
+    parser.add_argument("--word-lens", type=int, nargs="*", default=[4, 6, 7, 8, 11],
+                        help="word lengths, other than 5, to benchmark on synthetic corpora")
+    parser.add_argument("--scale", type=float, default=1., help="scales the number of operations of every benchmark")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--save", help="path to save the results to, as a JSON baseline")
+    parser.add_argument("--compare", help="path of a stored baseline to compare the results with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.scale, args.seed, args.word_lens)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({"metadata": create_metadata(args.seed, args.scale), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)["results"]
+
+        regressions = compare_results(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+        if len(regressions) > 0:
+            sys.exit(1)
+
+        print(f"No regressions past {args.threshold:.0%} compared with {args.compare}")
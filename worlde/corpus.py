@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import os
+import struct
+from typing import NamedTuple, Optional, List, Sequence, Tuple
+
+import numpy as np
+
+from engine.feedback import encode_words, decode_words
+from utils import DEFAULT_WORD_LEN, load_words, load_freqs, compute_word_weights_from_freqs, positive_int
+
+CORPUS_MAGIC = b"WRDC"
+CORPUS_VERSION = 1
+# magic, version, word length, number of words, columns flags, sha1 of the content
+HEADER_FORMAT = "<4sHHII20s"
+HEADER_SIZE = 64
+COLUMNS_ALIGNMENT = 8
+
+HAS_FREQS = 1
+HAS_WEIGHTS = 2
+
+
+class CorpusHeader(NamedTuple):
+    word_len: int
+    n_words: int
+    flags: int
+    content_hash: bytes
+
+    def columns_offset(self) -> int:
+        letters_end = HEADER_SIZE + (self.n_words * self.word_len)
+        return letters_end + (-letters_end % COLUMNS_ALIGNMENT)
+
+
+class Corpus(NamedTuple):
+    # N x L letters (0 for 'a'), and optional frequency / weight columns aligned with them.
+    # when loaded from a corpus file all of them are read-only memory maps, shared by all the processes using it
+    letters: np.ndarray
+    freqs: Optional[np.ndarray]
+    weights: Optional[np.ndarray]
+    content_hash: str
+
+    def __len__(self) -> int:
+        return len(self.letters)
+
+    def word(self, index: int) -> str:
+        return decode_words(self.letters[index])[0]
+
+    def words(self) -> List[str]:
+        return decode_words(self.letters)
+
+
+def compute_content_hash(letters: np.ndarray, freqs: Optional[np.ndarray], weights: Optional[np.ndarray]) -> bytes:
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(letters).tobytes())
+    for column in (freqs, weights):
+        if column is not None:
+            digest.update(np.ascontiguousarray(column).tobytes())
+
+    return digest.digest()
+
+
+def create_corpus(words: Sequence[str], freqs: Optional[Sequence[float]] = None,
+                  weights: Optional[Sequence[float]] = None) -> Corpus:
+    letters = encode_words(words)
+    freqs = None if freqs is None else np.asarray(freqs, dtype=np.float64)
+    weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+    return Corpus(letters, freqs, weights, compute_content_hash(letters, freqs, weights).hex())
+
+
+def save_corpus(path: str, corpus: Corpus):
+    n_words, word_len = corpus.letters.shape
+    flags = (HAS_FREQS if corpus.freqs is not None else 0) | (HAS_WEIGHTS if corpus.weights is not None else 0)
+    header = CorpusHeader(word_len, n_words, flags, bytes.fromhex(corpus.content_hash))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, CORPUS_MAGIC, CORPUS_VERSION, *header).ljust(HEADER_SIZE, b"\0"))
+        f.write(np.ascontiguousarray(corpus.letters, dtype=np.uint8).tobytes())
+        f.write(b"\0" * (header.columns_offset() - f.tell()))
+        for column in (corpus.freqs, corpus.weights):
+            if column is not None:
+                f.write(np.ascontiguousarray(column, dtype='<f8').tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_corpus_header(path: str) -> CorpusHeader:
+    with open(path, 'rb') as f:
+        raw_header = f.read(HEADER_SIZE)
+
+    magic, version, *fields = struct.unpack_from(HEADER_FORMAT, raw_header)
+    if magic != CORPUS_MAGIC:
+        raise ValueError(f"Not a corpus file: {path}")
+    if version != CORPUS_VERSION:
+        raise ValueError(f"Unsupported corpus version {version}: {path}")
+
+    return CorpusHeader(*fields)
+
+
+def load_corpus(path: str, verify: bool = False) -> Corpus:
+    header = read_corpus_header(path)
+    if header.n_words == 0:
+        # an empty range cannot be memory-mapped
+        empty_column = np.empty(0, dtype='<f8')
+        return Corpus(np.empty((0, header.word_len), dtype=np.uint8),
+                      empty_column if header.flags & HAS_FREQS else None,
+                      empty_column if header.flags & HAS_WEIGHTS else None, header.content_hash.hex())
+
+    shape = (header.n_words, header.word_len)
+    letters = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER_SIZE, shape=shape)
+
+    offset = header.columns_offset()
+    columns = []
+    for flag in (HAS_FREQS, HAS_WEIGHTS):
+        if header.flags & flag:
+            columns.append(np.memmap(path, dtype='<f8', mode='r', offset=offset, shape=(header.n_words,)))
+            offset += header.n_words * np.dtype('<f8').itemsize
+        else:
+            columns.append(None)
+
+    freqs, weights = columns
+    if verify and (compute_content_hash(letters, freqs, weights) != header.content_hash):
+        raise ValueError(f"Corrupted corpus file, content hash mismatch: {path}")
+
+    return Corpus(letters, freqs, weights, header.content_hash.hex())
+
+
+def load_words_or_corpus(words_path: str, corpus_path: Optional[str] = None,
+                         word_len: int = DEFAULT_WORD_LEN) -> Tuple[List[str], Optional[np.ndarray]]:
+    # the words, and their encoded letters if they were loaded from a corpus file (to be shared rather than encoded)
+    if corpus_path is None:
+        return list(load_words(words_path, word_len)), None
+
+    corpus = load_corpus(corpus_path)
+    if corpus.letters.shape[1] != word_len:
+        raise ValueError(f"The corpus {corpus_path} has words of {corpus.letters.shape[1]} letters, not {word_len}")
+    return corpus.words(), corpus.letters
+
+
+def convert_text_corpus(words_path: str, output_path: str, freqs_path: Optional[str] = None,
+                        word_len: int = DEFAULT_WORD_LEN) -> Corpus:
+    words = list(load_words(words_path, word_len))
+    if len(words) == 0:
+        raise ValueError(f"No words of {word_len} letters in {words_path}")
+    freqs, weights = None, None
+    if freqs_path is not None:
+        words_freqs = load_freqs(freqs_path)
+        freqs_map = dict(words_freqs)
+        weights_map = compute_word_weights_from_freqs(words_freqs)
+        # words without a known frequency get the lowest frequency and weight
+        freqs = [freqs_map.get(word, 0.) for word in words]
+        weights = [weights_map.get(word, 0.) for word in words]
+
+    corpus = create_corpus(words, freqs, weights)
+    save_corpus(output_path, corpus)
+    return corpus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a words text file to a packed corpus file")
+    parser.add_argument("words_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--freqs", dest="freqs_path")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the list are skipped)")
+    args = parser.parse_args()
+
+    corpus = convert_text_corpus(args.words_path, args.output_path, args.freqs_path, args.word_len)
+    print(f"Saved {len(corpus)} words ({corpus.content_hash}) to {args.output_path}")
@@ -1,3 +1,6 @@
 from engine.wordle_engine import WordLettersAnnotations, GuessFeedback, WordleEngine
-from engine.auto_wordle_engine import AutoWordleEngine, MaxTriesExceededError
+from engine.auto_wordle_engine import AutoWordleEngine, MaxTriesExceededError, InvalidGuessError
 from engine.cli_wordle_engine import CliWordleEngine
+from engine.pattern_matrix import PatternMatrix
+from engine.multi_board_engine import MultiBoardEngine, MultiBoardSession
+from engine.adversarial_wordle_engine import AdversarialWordleEngine, AdversaryPolicy, LargestBucketPolicy
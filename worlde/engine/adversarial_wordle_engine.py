@@ -0,0 +1,135 @@
+import abc
+from typing import List, Optional
+
+import numpy as np
+
+from engine.auto_wordle_engine import MaxTriesExceededError, InvalidGuessError
+from engine.feedback import encode_words, create_feedback_patterns, feedback_from_pattern
+from engine.hard_mode import HardModeRules
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import GuessFeedback, WordleEngine, WordleSessionEngine
+
+
+class AdversaryPolicy(abc.ABC):
+    # chooses the feedback of a guess among the buckets of the remaining answers, by their pattern.
+    # the buckets patterns are sorted ascending, so the solved pattern (the highest code) is the last if present
+
+    @abc.abstractmethod
+    def choose_pattern(self, guess: str, buckets_patterns: np.ndarray, buckets_sizes: np.ndarray) -> int:
+        pass
+
+
+class LargestBucketPolicy(AdversaryPolicy):
+    # keeps as many answers as possible. ties go to the lowest code (the fewest hints), so a solved pattern is
+    # chosen only when it is the last answer
+
+    def choose_pattern(self, guess: str, buckets_patterns: np.ndarray, buckets_sizes: np.ndarray) -> int:
+        return int(buckets_patterns[np.argmax(buckets_sizes)])
+
+
+class RandomBucketPolicy(AdversaryPolicy):
+    # a bucket with a probability proportional to its size, the same as a target drawn at random from the
+    # remaining answers
+
+    def __init__(self, random_seed: int = 1919):
+        self.rng = np.random.default_rng(seed=random_seed)
+
+    def choose_pattern(self, guess: str, buckets_patterns: np.ndarray, buckets_sizes: np.ndarray) -> int:
+        return int(self.rng.choice(buckets_patterns, p=buckets_sizes / buckets_sizes.sum()))
+
+
+class AdversarialWordleSession(WordleSessionEngine):
+    # no target is fixed in advance: every guess is answered by the policy with the pattern of one of the buckets
+    # of the remaining answers, and the answers narrow to that bucket
+
+    def __init__(self, answers: List[str], encoded_answers: np.ndarray, policy: AdversaryPolicy, max_tries: int = 6,
+                 patterns: Optional[PatternMatrix] = None, hard_mode: bool = False):
+        # with a patterns matrix, the answers must be its answers (columns)
+        self.answers = answers
+        self.encoded_answers = encoded_answers
+        self.policy = policy
+        self.max_tries = max_tries
+        self.patterns = patterns
+        self.hard_mode = hard_mode
+        self.__hard_mode_rules = HardModeRules.create_empty()
+        self.__indices = np.arange(len(answers))
+        self.guesses: List[str] = []
+
+        self.__solved = False
+        self.__failed = False
+
+    @property
+    def n_remaining(self) -> int:
+        return len(self.__indices)
+
+    def remaining_answers(self) -> List[str]:
+        return [self.answers[i] for i in self.__indices.tolist()]
+
+    @property
+    def target(self) -> Optional[str]:
+        # once closed, the first of the answers which were never ruled out
+        if not self.is_closed():
+            return None
+
+        return self.answers[self.__indices[0]]
+
+    def is_solved(self) -> bool:
+        return self.__solved
+
+    def is_failed(self) -> bool:
+        return self.__failed
+
+    def is_closed(self) -> bool:
+        return self.is_solved() or self.is_failed()
+
+    def guess(self, word: str) -> GuessFeedback:
+        if len(self.guesses) >= self.max_tries:
+            raise MaxTriesExceededError(self.max_tries)
+
+        if self.hard_mode:
+            violation = self.__hard_mode_rules.violation(word)
+            if violation is not None:
+                raise InvalidGuessError(word, violation)
+
+        self.guesses.append(word)
+        answers_patterns = self.__compute_patterns(word)
+        buckets_patterns, buckets_sizes = np.unique(answers_patterns, return_counts=True)
+        pattern = self.policy.choose_pattern(word, buckets_patterns, buckets_sizes)
+        self.__indices = self.__indices[answers_patterns == pattern]
+
+        feedback = feedback_from_pattern(word, pattern)
+        if self.hard_mode:
+            self.__hard_mode_rules = self.__hard_mode_rules.update(feedback)
+        if feedback.is_solved():
+            self.__solved = True
+        elif len(self.guesses) == self.max_tries:
+            self.__failed = True
+
+        return feedback
+
+    def __compute_patterns(self, word: str) -> np.ndarray:
+        patterns = self.patterns
+        if (patterns is not None) and (word in patterns.guesses_index):
+            return patterns.matrix[patterns.guesses_index[word], self.__indices]
+
+        return create_feedback_patterns(encode_words([word])[0], self.encoded_answers[self.__indices])
+
+
+class AdversarialWordleEngine(WordleEngine[AdversarialWordleSession]):
+    # Absurdle-like sessions, for the worst case of the solvers. the policy is shared by the sessions
+
+    def __init__(self, possible_answers: List[str], max_tries: int = 6, policy: Optional[AdversaryPolicy] = None,
+                 patterns: Optional[PatternMatrix] = None, hard_mode: bool = False):
+        if (patterns is not None) and (patterns.answers != list(possible_answers)):
+            raise ValueError("The possible answers must be the answers of the patterns matrix")
+
+        self.possible_answers = list(possible_answers)
+        self.encoded_answers = encode_words(self.possible_answers)
+        self.max_tries = max_tries
+        self.policy = policy or LargestBucketPolicy()
+        self.patterns = patterns
+        self.hard_mode = hard_mode
+
+    def new_session(self) -> AdversarialWordleSession:
+        return AdversarialWordleSession(self.possible_answers, self.encoded_answers, self.policy, self.max_tries,
+                                        self.patterns, self.hard_mode)
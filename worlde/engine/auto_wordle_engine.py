@@ -1,8 +1,10 @@
-from collections import Counter
 from typing import List, Iterable, NamedTuple, Union, Optional
 
 import numpy as np
 
+from engine.feedback import create_feedback
+from engine.hard_mode import HardModeRules
+from engine.pattern_matrix import PatternMatrix
 from engine.wordle_engine import GuessFeedback, WordleEngine, WordLettersAnnotations, WordleSessionEngine, T
 
 
@@ -11,38 +13,20 @@ class MaxTriesExceededError(Exception):
         super().__init__(f"You've exceeded the maximal number of tries: {max_tries}")
 
 
-def create_feedback(word: str, target: str) -> 'GuessFeedback':
-    if word == target:
-        return GuessFeedback.create_solved_feedback(target)
-
-    letters_counts = Counter(target)
-    labels: List[WordLettersAnnotations] = [None for _ in range(len(target))]
-
-    for index, letter in enumerate(word):
-        if letter == target[index]:
-            labels[index] = WordLettersAnnotations.EXACT_POS
-            letters_counts[letter] -= 1
-
-    for index, letter in enumerate(word):
-        if labels[index] is not None:
-            continue
-
-        if letters_counts[letter] > 0:
-            labels[index] = WordLettersAnnotations.FALSE_POS
-            letters_counts[letter] -= 1
-
-    for i in range(len(labels)):
-        if labels[i] is None:
-            labels[i] = WordLettersAnnotations.FALSE_LETTER
-
-    return GuessFeedback(word, labels)
+class InvalidGuessError(Exception):
+    def __init__(self, word: str, reason: str):
+        super().__init__(f"Invalid guess {word} in hard mode: {reason}")
 
 
 class PredefinedWordleSession(WordleSessionEngine):
 
-    def __init__(self, target: str, max_tries: int = 6):
+    def __init__(self, target: str, max_tries: int = 6, patterns: Optional[PatternMatrix] = None,
+                 hard_mode: bool = False):
         self.__target: str = target
         self.max_tries = max_tries
+        self.patterns = patterns
+        self.hard_mode = hard_mode
+        self.__hard_mode_rules = HardModeRules.create_empty()
         self.__n_tries: int = 0
         self.guesses: List[str] = []
 
@@ -80,9 +64,16 @@ class PredefinedWordleSession(WordleSessionEngine):
         if self.__n_tries >= self.max_tries:
             raise MaxTriesExceededError(self.max_tries)
 
+        if self.hard_mode:
+            violation = self.__hard_mode_rules.violation(word)
+            if violation is not None:
+                raise InvalidGuessError(word, violation)
+
         self.__n_tries += 1
         self.guesses.append(word)
-        feedback = create_feedback(word, self.__target)
+        feedback = self.__create_feedback(word)
+        if self.hard_mode:
+            self.__hard_mode_rules = self.__hard_mode_rules.update(feedback)
         if (not self.__solved) and feedback.is_solved():
             self.__solved = True
         elif self.__n_tries == self.max_tries:
@@ -90,14 +81,22 @@ class PredefinedWordleSession(WordleSessionEngine):
 
         return feedback
 
+    def __create_feedback(self, word: str) -> GuessFeedback:
+        if (self.patterns is not None) and self.patterns.has_pattern(word, self.__target):
+            return self.patterns.feedback(word, self.__target)
+
+        return create_feedback(word, self.__target)
+
 
 class AutoWordleEngine(WordleEngine[PredefinedWordleSession]):
 
     def __init__(self, possible_answers: List[str], allowed_guesses: List[str], max_tries: int = 6,
-                 random_seed: int = 1919):
+                 random_seed: int = 1919, patterns: Optional[PatternMatrix] = None, hard_mode: bool = False):
         self.possible_answers = possible_answers
         self.allowed_guesses = allowed_guesses
         self.max_tries = max_tries
+        self.patterns = patterns
+        self.hard_mode = hard_mode
 
         self.rng = np.random.default_rng(seed=random_seed)
         self.answers_indices = list(range(len(self.possible_answers)))
@@ -110,7 +109,7 @@ class AutoWordleEngine(WordleEngine[PredefinedWordleSession]):
     def new_session(self) -> PredefinedWordleSession:
         target = self.possible_answers[self.__next_target]
         self.__next_target: str = None
-        return PredefinedWordleSession(target, self.max_tries)
+        return PredefinedWordleSession(target, self.max_tries, self.patterns, self.hard_mode)
 
     def has_next_word(self):
         try:
@@ -37,7 +37,7 @@ class CliWordleSession(WordleSessionEngine):
             raw_input = input()
 
         annotations = map_annotations_from_str(raw_input)
-        feedback = GuessFeedback(word, annotations)
+        feedback = GuessFeedback.from_labels(word, annotations)
         if feedback.is_solved():
             self.solved = True
 
@@ -0,0 +1,134 @@
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+
+from engine.wordle_engine import GuessFeedback, count_patterns, EXACT_POS, FALSE_POS, FALSE_LETTER
+
+
+def create_feedback(word: str, target: str) -> 'GuessFeedback':
+    if word == target:
+        return GuessFeedback.create_solved_feedback(target)
+
+    letters_counts = Counter(target)
+    values: List[int] = [FALSE_LETTER for _ in range(len(target))]
+
+    for index, letter in enumerate(word):
+        if letter == target[index]:
+            values[index] = EXACT_POS
+            letters_counts[letter] -= 1
+
+    for index, letter in enumerate(word):
+        if values[index] == EXACT_POS:
+            continue
+
+        if letters_counts[letter] > 0:
+            values[index] = FALSE_POS
+            letters_counts[letter] -= 1
+
+    pattern = 0
+    for value in reversed(values):
+        pattern = (pattern * 3) + value
+
+    return GuessFeedback(word, pattern)
+
+
+ALPHABET_SIZE = 26
+FEEDBACK_BLOCK_SIZE = 512
+# the narrowest unsigned type of the pattern codes of each word length: 3^5 fits in a byte, 3^10 in 2 bytes
+PATTERNS_DTYPES = (np.uint8, np.uint16, np.uint32)
+
+
+def patterns_dtype(word_len: int) -> np.dtype:
+    n_patterns = count_patterns(word_len)
+    for dtype in PATTERNS_DTYPES:
+        if n_patterns - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    raise ValueError(f"Unsupported word length: {word_len}")
+
+
+def encode_words(words: Sequence[str]) -> np.ndarray:
+    if len(words) == 0:
+        return np.empty((0, 0), dtype=np.uint8)
+
+    letters = np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8)
+    return (letters - ord('a')).reshape(len(words), -1)
+
+
+def decode_words(encoded: np.ndarray) -> List[str]:
+    encoded = np.atleast_2d(encoded)
+    n_words, word_len = encoded.shape
+    if word_len == 0:
+        return ["" for _ in range(n_words)]
+
+    # every row viewed as a single bytes item, decoded all at once
+    letters = np.ascontiguousarray(encoded + ord('a'), dtype=np.uint8)
+    return letters.view(f"S{word_len}").ravel().astype(str).tolist()
+
+
+def count_letters(encoded: np.ndarray) -> np.ndarray:
+    counts = np.zeros((len(encoded), ALPHABET_SIZE), dtype=np.uint8)
+    rows = np.arange(len(encoded))
+    for position in range(encoded.shape[1]):
+        counts[rows, encoded[:, position]] += 1
+
+    return counts
+
+
+def _compute_patterns_block(guesses: np.ndarray, targets: np.ndarray, targets_counts: np.ndarray) -> np.ndarray:
+    word_len = guesses.shape[1]
+    exact = guesses[:, None, :] == targets[None, :, :]
+    not_exact = ~exact
+    same_letter = guesses[:, :, None] == guesses[:, None, :]
+
+    patterns = np.zeros((len(guesses), len(targets)), dtype=np.int64)
+    for i in range(word_len):
+        # occurrences of the guessed letter in the target which are not matched exactly,
+        # and the occurrences of that letter earlier in the guess which already took one of them
+        available = targets_counts[:, guesses[:, i]].T.astype(np.int8)
+        taken = np.zeros_like(available)
+        for j in range(word_len):
+            if j == i:
+                continue
+
+            is_same_letter = same_letter[:, i, j, None]
+            available -= exact[:, :, j] & is_same_letter
+            if j < i:
+                taken += not_exact[:, :, j] & is_same_letter
+
+        false_pos = not_exact[:, :, i] & (taken < available)
+        labels = np.where(exact[:, :, i], EXACT_POS, false_pos)
+        patterns += labels * (3 ** i)
+
+    return patterns
+
+
+def create_feedback_patterns(guesses: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    # scores encoded guesses against encoded targets, a single word (1d) or many words (2d) on each side,
+    # with the same repeated letters logic as `create_feedback`
+    guesses = np.asarray(guesses, dtype=np.uint8)
+    targets = np.asarray(targets, dtype=np.uint8)
+    guesses_2d = np.atleast_2d(guesses)
+    targets_2d = np.atleast_2d(targets)
+    targets_counts = count_letters(targets_2d)
+
+    patterns = np.empty((len(guesses_2d), len(targets_2d)), dtype=patterns_dtype(guesses_2d.shape[1]))
+    for start in range(0, len(guesses_2d), FEEDBACK_BLOCK_SIZE):
+        end = start + FEEDBACK_BLOCK_SIZE
+        patterns[start: end] = _compute_patterns_block(guesses_2d[start: end], targets_2d, targets_counts)
+
+    if guesses.ndim == 1:
+        patterns = patterns[0]
+    if targets.ndim == 1:
+        patterns = patterns[..., 0]
+
+    return patterns
+
+
+def create_feedback_pattern(word: str, target: str) -> int:
+    return create_feedback(word, target).pattern
+
+
+def feedback_from_pattern(word: str, pattern: int) -> GuessFeedback:
+    return GuessFeedback(word, int(pattern))
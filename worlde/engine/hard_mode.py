@@ -0,0 +1,43 @@
+from collections import Counter
+from typing import NamedTuple, Dict, Optional
+
+from engine.wordle_engine import GuessFeedback, EXACT_POS, FALSE_LETTER, decode_pattern_values
+
+
+class HardModeRules(NamedTuple):
+    # the revealed hints must be used by every later guess: the exact letters in their positions, and at least as
+    # many occurrences of every letter as were revealed
+    exact_positions: Dict[int, str]
+    min_counts: Dict[str, int]
+
+    def violation(self, word: str) -> Optional[str]:
+        for position, letter in sorted(self.exact_positions.items()):
+            if word[position] != letter:
+                return f"Letter {position + 1} must be {letter}"
+
+        letters_counts = Counter(word)
+        for letter, min_count in sorted(self.min_counts.items()):
+            if letters_counts[letter] < min_count:
+                return f"The guess must contain {min_count} {letter}"
+
+        return None
+
+    def update(self, feedback: GuessFeedback) -> 'HardModeRules':
+        exact_positions = dict(self.exact_positions)
+        min_counts = dict(self.min_counts)
+        revealed_counts = Counter()
+        values = decode_pattern_values(feedback.pattern, len(feedback.word))
+        for position, (letter, value) in enumerate(zip(feedback.word, values)):
+            if value == EXACT_POS:
+                exact_positions[position] = letter
+            if value != FALSE_LETTER:
+                revealed_counts[letter] += 1
+
+        for letter, count in revealed_counts.items():
+            min_counts[letter] = max(count, min_counts.get(letter, 0))
+
+        return HardModeRules(exact_positions, min_counts)
+
+    @staticmethod
+    def create_empty() -> 'HardModeRules':
+        return HardModeRules({}, {})
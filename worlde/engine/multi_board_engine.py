@@ -0,0 +1,66 @@
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from engine.auto_wordle_engine import PredefinedWordleSession, MaxTriesExceededError
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import GuessFeedback, WordleEngine, WordleSessionEngine
+
+# the number of tries of N boards is N + 5, as in Quordle (9) and Octordle (13)
+EXTRA_TRIES = 5
+
+
+class MultiBoardFeedback(NamedTuple):
+    word: str
+    # None for the boards which were solved before the guess
+    boards: List[Optional[GuessFeedback]]
+
+    def is_solved(self) -> bool:
+        return all((feedback is None) or feedback.is_solved() for feedback in self.boards)
+
+
+class MultiBoardSession(WordleSessionEngine):
+    # several targets guessed together, every guess is played on all the boards which are not solved yet
+
+    def __init__(self, targets: List[str], max_tries: Optional[int] = None, patterns: Optional[PatternMatrix] = None):
+        if max_tries is None:
+            max_tries = len(targets) + EXTRA_TRIES
+
+        self.max_tries = max_tries
+        self.boards = [PredefinedWordleSession(target, max_tries, patterns) for target in targets]
+        self.guesses: List[str] = []
+
+    @property
+    def n_boards(self) -> int:
+        return len(self.boards)
+
+    def guess(self, word: str) -> MultiBoardFeedback:
+        if len(self.guesses) >= self.max_tries:
+            raise MaxTriesExceededError(self.max_tries)
+
+        self.guesses.append(word)
+        boards_feedbacks = [None if board.is_solved() else board.guess(word) for board in self.boards]
+        return MultiBoardFeedback(word, boards_feedbacks)
+
+    def is_solved(self) -> bool:
+        return all(board.is_solved() for board in self.boards)
+
+    def solved_boards(self) -> List[bool]:
+        return [board.is_solved() for board in self.boards]
+
+
+class MultiBoardEngine(WordleEngine[MultiBoardSession]):
+
+    def __init__(self, possible_answers: List[str], n_boards: int = 4, max_tries: Optional[int] = None,
+                 random_seed: int = 1919, patterns: Optional[PatternMatrix] = None):
+        self.possible_answers = possible_answers
+        self.n_boards = n_boards
+        self.max_tries = max_tries
+        self.patterns = patterns
+        self.rng = np.random.default_rng(seed=random_seed)
+
+    def new_session(self) -> MultiBoardSession:
+        # distinct targets on the boards of a session
+        targets_indices = self.rng.choice(len(self.possible_answers), self.n_boards, replace=False)
+        targets = [self.possible_answers[i] for i in targets_indices.tolist()]
+        return MultiBoardSession(targets, self.max_tries, self.patterns)
@@ -0,0 +1,80 @@
+import hashlib
+import os
+from typing import List, Dict, Optional
+
+import numpy as np
+
+from engine.feedback import feedback_from_pattern, create_feedback_patterns, encode_words
+from engine.wordle_engine import GuessFeedback, count_patterns
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "cache")
+
+
+def compute_words_lists_hash(guesses: List[str], answers: List[str]) -> str:
+    digest = hashlib.sha1()
+    digest.update("\n".join(guesses).encode("ascii"))
+    digest.update(b"\0")
+    digest.update("\n".join(answers).encode("ascii"))
+    return digest.hexdigest()
+
+
+def compute_patterns_matrix(guesses: List[str], answers: List[str]) -> np.ndarray:
+    matrix = create_feedback_patterns(encode_words(guesses), encode_words(answers))
+    # stored column-major, so the patterns of a candidates subset against all the guesses are contiguous.
+    # the codes type is the narrowest for the word length (see `patterns_dtype`)
+    return np.asfortranarray(matrix)
+
+
+def save_patterns_matrix(path: str, matrix: np.ndarray):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # write to a temporary file first, so concurrent runners never load a partially written matrix
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, path)
+
+
+# the feedback of every allowed guess against every possible answer, stored as base-3 pattern codes
+class PatternMatrix:
+
+    def __init__(self, guesses: List[str], answers: List[str], matrix: np.ndarray):
+        self.guesses = guesses
+        self.answers = answers
+        self.matrix = matrix
+
+        self.guesses_index: Dict[str, int] = {word: i for i, word in enumerate(guesses)}
+        self.answers_index: Dict[str, int] = {word: i for i, word in enumerate(answers)}
+
+    @property
+    def word_len(self) -> int:
+        return len(self.answers[0])
+
+    @property
+    def n_patterns(self) -> int:
+        return count_patterns(self.word_len)
+
+    def has_pattern(self, guess: str, target: str) -> bool:
+        return (guess in self.guesses_index) and (target in self.answers_index)
+
+    def pattern(self, guess: str, target: str) -> int:
+        return int(self.matrix[self.guesses_index[guess], self.answers_index[target]])
+
+    def row(self, guess: str) -> np.ndarray:
+        return self.matrix[self.guesses_index[guess]]
+
+    def feedback(self, guess: str, target: str) -> GuessFeedback:
+        return feedback_from_pattern(guess, self.pattern(guess, target))
+
+    @staticmethod
+    def compute(guesses: List[str], answers: List[str]) -> 'PatternMatrix':
+        return PatternMatrix(guesses, answers, compute_patterns_matrix(guesses, answers))
+
+    @staticmethod
+    def load_or_compute(guesses: List[str], answers: List[str], cache_dir: Optional[str] = None) -> 'PatternMatrix':
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        words_hash = compute_words_lists_hash(guesses, answers)
+        path = os.path.join(cache_dir, f"patterns-{words_hash}.npy")
+        if not os.path.exists(path):
+            save_patterns_matrix(path, compute_patterns_matrix(guesses, answers))
+
+        return PatternMatrix(guesses, answers, np.load(path, mmap_mode='r'))
@@ -0,0 +1,49 @@
+import os
+import random
+from typing import List
+
+import pytest
+
+from engine.feedback import create_feedback, create_feedback_patterns, encode_words
+from utils import load_wordslist
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+
+def create_random_words(rng: random.Random, n_words: int, word_len: int, alphabet: str) -> List[str]:
+    return ["".join(rng.choice(alphabet) for _ in range(word_len)) for _ in range(n_words)]
+
+
+@pytest.mark.parametrize("word_len", [1, 4, 5, 7])
+def test_patterns_match_create_feedback(word_len: int):
+    # a small alphabet, so most words repeat letters in the guess, the target or both
+    rng = random.Random(word_len)
+    guesses = create_random_words(rng, 60, word_len, "abcd")
+    targets = create_random_words(rng, 80, word_len, "abcde")
+    patterns = create_feedback_patterns(encode_words(guesses), encode_words(targets))
+    assert patterns.shape == (len(guesses), len(targets))
+    for i, guess in enumerate(guesses):
+        for j, target in enumerate(targets):
+            assert patterns[i, j] == create_feedback(guess, target).pattern
+
+
+def test_patterns_match_create_feedback_of_real_words():
+    rng = random.Random(11)
+    words = load_wordslist(os.path.join(RESOURCES_DIR, "allowed_words.txt"))
+    # more guesses than a block, so the blocks are stitched together
+    guesses = rng.sample(words, 600) + ["geese", "eerie", "mamma", "sassy"]
+    targets = rng.sample(words, 50) + ["emcee", "sheep", "llama", "asses"]
+    patterns = create_feedback_patterns(encode_words(guesses), encode_words(targets))
+    for i, guess in enumerate(guesses):
+        for j, target in enumerate(targets):
+            assert patterns[i, j] == create_feedback(guess, target).pattern
+
+
+def test_patterns_shapes():
+    guesses, targets = ["crane", "geese"], ["eerie", "sheep", "crane"]
+    encoded_guesses, encoded_targets = encode_words(guesses), encode_words(targets)
+    assert create_feedback_patterns(encoded_guesses[1], encoded_targets).tolist() == \
+        [create_feedback("geese", target).pattern for target in targets]
+    assert create_feedback_patterns(encoded_guesses, encoded_targets[0]).tolist() == \
+        [create_feedback(guess, "eerie").pattern for guess in guesses]
+    assert create_feedback_patterns(encoded_guesses[0], encoded_targets[2]) == create_feedback("crane", "crane").pattern
@@ -1,4 +1,5 @@
-from typing import NamedTuple, List, TypeVar, Generic
+from functools import lru_cache
+from typing import NamedTuple, TypeVar, Generic, Sequence, Tuple
 
 import abc
 from enum import Enum
@@ -10,19 +11,64 @@ class WordLettersAnnotations(Enum):
     FALSE_LETTER = 0
 
 
+# the digits of the annotations in the pattern codes
+EXACT_POS = WordLettersAnnotations.EXACT_POS.value
+FALSE_POS = WordLettersAnnotations.FALSE_POS.value
+FALSE_LETTER = WordLettersAnnotations.FALSE_LETTER.value
+
+
+def encode_annotations(labels: Sequence[WordLettersAnnotations]) -> int:
+    # base-3 code, the annotation of the first letter is the least significant digit
+    code = 0
+    for label in reversed(labels):
+        code = (code * 3) + label.value
+
+    return code
+
+
+@lru_cache(maxsize=None)
+def decode_pattern_values(code: int, word_len: int) -> Tuple[int, ...]:
+    values = []
+    for _ in range(word_len):
+        code, value = divmod(code, 3)
+        values.append(value)
+
+    return tuple(values)
+
+
+@lru_cache(maxsize=None)
+def decode_pattern(code: int, word_len: int) -> Tuple[WordLettersAnnotations, ...]:
+    return tuple(map(WordLettersAnnotations, decode_pattern_values(code, word_len)))
+
+
+def count_patterns(word_len: int) -> int:
+    return 3 ** word_len
+
+
+def solved_pattern(word_len: int) -> int:
+    return count_patterns(word_len) - 1
+
+
 class GuessFeedback(NamedTuple):
     word: str
-    labels: List[WordLettersAnnotations]
+    # the base-3 code of the annotations (see `encode_annotations`)
+    pattern: int
+
+    @property
+    def labels(self) -> Tuple[WordLettersAnnotations, ...]:
+        # the annotations view, the decoded tuples are shared by all the feedbacks with the same pattern
+        return decode_pattern(self.pattern, len(self.word))
 
     def is_solved(self) -> bool:
-        return all(label is WordLettersAnnotations.EXACT_POS for label in self.labels)
+        return self.pattern == solved_pattern(len(self.word))
 
     @staticmethod
     def create_solved_feedback(target: str):
-        return GuessFeedback(
-            target,
-            [WordLettersAnnotations.EXACT_POS for _ in range(len(target))]
-        )
+        return GuessFeedback(target, solved_pattern(len(target)))
+
+    @staticmethod
+    def from_labels(word: str, labels: Sequence[WordLettersAnnotations]) -> 'GuessFeedback':
+        return GuessFeedback(word, encode_annotations(labels))
 
 
 class WordleSessionEngine(abc.ABC):
@@ -0,0 +1,293 @@
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Dict, List, Optional, AsyncIterator
+
+from corpus import load_words_or_corpus
+from engine import GuessFeedback, PatternMatrix
+from engine.cli_wordle_engine import is_valid_annotations_input, map_annotations_from_str
+from solver.opening_book import OpeningBook
+from solver.ranking_cache import RankingCache
+from solver.simplified_entropy_solver import SimplifiedEntropySolver, RankingMode
+from solver.wordle_solver import WordleSolver
+from utils import DEFAULT_WORD_LEN, load_wordslist, positive_int
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_N_SUGGESTIONS = 5
+DEFAULT_MAX_PENDING = 256
+DEFAULT_MAX_SESSIONS = 100_000
+DEFAULT_SESSION_TTL = 3600.
+MAX_LINE_LENGTH = 4096
+
+
+class ServiceError(Exception):
+    pass
+
+
+class SolverSessionState:
+    # a session driven by requests: the solver (shared by all the sessions) and the context of the session
+
+    def __init__(self, solver: WordleSolver, n_suggestions: int):
+        self.solver = solver
+        self.n_suggestions = n_suggestions
+        self.solved = False
+        self.lock = asyncio.Lock()
+        self.last_access = time.monotonic()
+        self.context = solver.create_context()
+        self.suggestions = self.__take_suggestions()
+
+    def __take_suggestions(self) -> List[str]:
+        context = self.context
+        suggestions = list(islice(context.guesses_iter, self.n_suggestions))
+        # the suggestions are put back, the solver filters the next guesses out of the whole iterator
+        context.guesses_iter = chain(suggestions, context.guesses_iter)
+        return suggestions
+
+    def advance(self, guess: str, feedback: GuessFeedback) -> List[str]:
+        # CPU heavy, runs in the executor
+        self.solver.advance(self.context, guess, feedback)
+        if feedback.is_solved():
+            self.solved = True
+            self.suggestions = []
+            return self.suggestions
+
+        self.suggestions = self.__take_suggestions()
+        return self.suggestions
+
+    def to_json(self, session_id: str) -> dict:
+        response = {
+            "session": session_id,
+            "n_guesses": self.context.n_guesses,
+            "solved": self.solved,
+            "suggestions": self.suggestions,
+        }
+        if self.context.candidates is not None:
+            response["n_candidates"] = len(self.context.candidates)
+
+        return response
+
+
+class SolverService:
+    # hosts many concurrent sessions over line-delimited JSON. every request is a JSON object with an "op":
+    #   {"op": "new"} -> a new session with the first suggestions
+    #   {"op": "feedback", "session": id, "guess": "crane", "feedback": "01200"} -> the next suggestions
+    #   {"op": "close", "session": id}
+    # all the sessions share the solver tables (corpus, patterns matrix, rankings cache). the ranking runs in a
+    # thread pool, so the event loop keeps serving while it runs. requests beyond `max_pending` rankings in flight
+    # are rejected rather than queued, which keeps the latency of the accepted ones bounded.
+
+    def __init__(self, solver: WordleSolver, n_suggestions: int = DEFAULT_N_SUGGESTIONS,
+                 executor: Optional[ThreadPoolExecutor] = None, max_pending: int = DEFAULT_MAX_PENDING,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, session_ttl: float = DEFAULT_SESSION_TTL,
+                 word_len: int = DEFAULT_WORD_LEN):
+        self.solver = solver
+        self.word_len = word_len
+        self.n_suggestions = n_suggestions
+        self.executor = executor or ThreadPoolExecutor()
+        self.max_pending = max_pending
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, SolverSessionState] = {}
+        self.n_pending = 0
+
+    async def handle_request(self, request: dict) -> dict:
+        try:
+            op = request.get("op")
+            if op == "new":
+                response = self.__new_session()
+            elif op == "feedback":
+                response = await self.__feedback(request)
+            elif op == "close":
+                response = self.__close_session(request)
+            else:
+                raise ServiceError(f"Unknown op: {op}")
+        except ServiceError as e:
+            response = {"error": str(e)}
+
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    def __new_session(self) -> dict:
+        if len(self.sessions) >= self.max_sessions:
+            self.expire_sessions()
+            if len(self.sessions) >= self.max_sessions:
+                raise ServiceError("Too many sessions")
+
+        session_id = uuid.uuid4().hex
+        session = SolverSessionState(self.solver, self.n_suggestions)
+        self.sessions[session_id] = session
+        return session.to_json(session_id)
+
+    async def __feedback(self, request: dict) -> dict:
+        session_id, session = self.__get_session(request)
+        guess, feedback = parse_feedback(request, self.word_len)
+        if self.n_pending >= self.max_pending:
+            raise ServiceError("Overloaded, retry later")
+
+        # the requests of a session are applied one at a time, in their arrival order
+        self.n_pending += 1
+        try:
+            async with session.lock:
+                if session.solved:
+                    raise ServiceError("The session is already solved")
+
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(self.executor, session.advance, guess, feedback)
+                except Exception as e:
+                    # the solver leaves the context untouched when the feedback fails to apply
+                    raise ServiceError(f"Failed to apply the feedback: {e}")
+        finally:
+            self.n_pending -= 1
+
+        return session.to_json(session_id)
+
+    def __close_session(self, request: dict) -> dict:
+        session_id, _ = self.__get_session(request)
+        del self.sessions[session_id]
+        return {"session": session_id, "closed": True}
+
+    def __get_session(self, request: dict):
+        session_id = request.get("session")
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise ServiceError(f"Unknown session: {session_id}")
+
+        session.last_access = time.monotonic()
+        return session_id, session
+
+    def expire_sessions(self) -> int:
+        deadline = time.monotonic() - self.session_ttl
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if (session.last_access < deadline) and (not session.lock.locked())]
+        for session_id in expired:
+            del self.sessions[session_id]
+
+        return len(expired)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # the requests of a connection are served concurrently, the responses are written as they complete
+        # (with the request "id" echoed back to match them)
+        tasks = set()
+        try:
+            async for line in iter_lines(reader):
+                task = asyncio.create_task(self.__respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if len(tasks) > 0:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def __respond(self, line: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("The request must be an object")
+        except ValueError as e:
+            response = {"error": f"Invalid request: {e}"}
+        else:
+            response = await self.handle_request(request)
+
+        writer.write(json.dumps(response).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def expire_sessions_periodically(self):
+        while True:
+            await asyncio.sleep(self.session_ttl / 4)
+            self.expire_sessions()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_LENGTH)
+        expiration = asyncio.create_task(self.expire_sessions_periodically())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiration.cancel()
+
+
+async def iter_lines(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    while True:
+        try:
+            line = await reader.readline()
+        except (ValueError, ConnectionError):
+            # a line over the limit, or a dropped connection
+            return
+        if len(line) == 0:
+            return
+        if len(line.strip()) > 0:
+            yield line
+
+
+def parse_feedback(request: dict, word_len: int = DEFAULT_WORD_LEN):
+    guess = request.get("guess")
+    raw_annotations = request.get("feedback")
+    if (not isinstance(guess, str)) or (len(guess) != word_len) or (not guess.isascii()) or (not guess.isalpha()):
+        raise ServiceError(f"Invalid guess: {guess}")
+    if (not isinstance(raw_annotations, str)) or (not is_valid_annotations_input(raw_annotations, word_len)):
+        raise ServiceError(f"Invalid feedback: {raw_annotations}")
+
+    try:
+        labels = map_annotations_from_str(raw_annotations)
+    except ValueError:
+        raise ServiceError(f"Invalid feedback: {raw_annotations}")
+
+    guess = guess.lower()
+    return guess, GuessFeedback.from_labels(guess, labels)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--ranking-mode", choices=[mode.value for mode in RankingMode],
+                        default=RankingMode.LETTERS_HEURISTIC.value)
+    parser.add_argument("--suggestions", type=int, default=DEFAULT_N_SUGGESTIONS)
+    parser.add_argument("--workers", type=int, default=None, help="ranking threads")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--cache-path", help="ranked guesses cache path, loaded at start and saved at exit")
+    parser.add_argument("--book", help="opening book path, compiled for the same options (see compile_opening_book)")
+    parser.add_argument("--prescreen-k", type=positive_int, default=None,
+                        help="rank only the top k guesses of a cheap pre-screen when falling back to the dictionary")
+    parser.add_argument("--endgame-threshold", type=positive_int, default=None,
+                        help="search the optimal guess exhaustively once at most this many candidates remain")
+    parser.add_argument("--words-path", default="../resources/allowed_words.txt", help="the allowed guesses list")
+    parser.add_argument("--answers-path", default="../resources/possible_words.txt", help="the possible answers list")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the word lists are skipped)")
+    parser.add_argument("--corpus", help="a packed corpus of the allowed words (see corpus.py), memory-mapped rather "
+                                         "than parsed")
+    args = parser.parse_args()
+
+    max_guesses = 6
+
+    all_words, encoded_words = load_words_or_corpus(args.words_path, args.corpus, args.word_len)
+    possible_answers = load_wordslist(args.answers_path, args.word_len)
+    if (len(all_words) == 0) or (len(possible_answers) == 0):
+        parser.error(f"No words of {args.word_len} letters in the word lists")
+
+    patterns = PatternMatrix.load_or_compute(all_words, possible_answers)
+    ranking_cache = RankingCache(args.cache_size) if args.cache_size > 0 else None
+    book = OpeningBook.load(args.book) if args.book else None
+    solver = SimplifiedEntropySolver(all_words, max_guesses, patterns, RankingMode(args.ranking_mode), book=book,
+                                     ranking_cache=ranking_cache, prescreen_k=args.prescreen_k,
+                                     endgame_threshold=args.endgame_threshold, encoded_guesses=encoded_words)
+    if (ranking_cache is not None) and args.cache_path:
+        ranking_cache.load(args.cache_path, solver.ranking_config())
+
+    service = SolverService(solver, args.suggestions, ThreadPoolExecutor(args.workers), args.max_pending,
+                            word_len=args.word_len)
+    print(f"Serving on {args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    finally:
+        if (ranking_cache is not None) and args.cache_path:
+            ranking_cache.save(args.cache_path, solver.ranking_config())
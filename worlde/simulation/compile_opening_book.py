@@ -0,0 +1,50 @@
+import argparse
+
+from corpus import load_words_or_corpus
+from engine import PatternMatrix
+from engine.auto_wordle_engine import AutoWordleEngine
+from simulation.sharded_runner import iter_sharded_results, engine_targets
+from solver.endgame_solver import EndgameObjective
+from solver.opening_book import build_opening_book
+from solver.simplified_entropy_solver import SimplifiedEntropySolver, RankingMode
+from utils import DEFAULT_WORD_LEN, load_wordslist, positive_int
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output_path")
+    parser.add_argument("--ranking-mode", choices=[mode.value for mode in RankingMode],
+                        default=RankingMode.LETTERS_HEURISTIC.value)
+    parser.add_argument("--prescreen-k", type=positive_int, default=None,
+                        help="rank only the top k guesses of a cheap pre-screen when falling back to the dictionary")
+    parser.add_argument("--endgame-threshold", type=positive_int, default=None,
+                        help="search the optimal guess exhaustively once at most this many candidates remain")
+    parser.add_argument("--endgame-objective", choices=[objective.value for objective in EndgameObjective],
+                        default=EndgameObjective.EXPECTED.value)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--words-path", default="../resources/allowed_words.txt", help="the allowed guesses list")
+    parser.add_argument("--answers-path", default="../resources/possible_words.txt", help="the possible answers list")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the word lists are skipped)")
+    parser.add_argument("--corpus", help="a packed corpus of the allowed words (see corpus.py), memory-mapped rather "
+                                         "than parsed")
+    args = parser.parse_args()
+
+    max_guesses = 6
+
+    all_words, encoded_words = load_words_or_corpus(args.words_path, args.corpus, args.word_len)
+    possible_answers = load_wordslist(args.answers_path, args.word_len)
+    if (len(all_words) == 0) or (len(possible_answers) == 0):
+        parser.error(f"No words of {args.word_len} letters in the word lists")
+
+    patterns = PatternMatrix.load_or_compute(all_words, possible_answers)
+    ranking_mode = RankingMode(args.ranking_mode)
+    solver = SimplifiedEntropySolver(all_words, max_guesses, patterns, ranking_mode, prescreen_k=args.prescreen_k,
+                                     endgame_threshold=args.endgame_threshold,
+                                     endgame_objective=EndgameObjective(args.endgame_objective),
+                                     encoded_guesses=encoded_words)
+
+    targets = engine_targets(AutoWordleEngine(possible_answers, all_words))
+    results = iter_sharded_results(targets, solver, max_guesses, patterns, n_workers=args.workers)
+    book = build_opening_book(((result.target, result.guesses) for result in results), config=solver.ranking_config())
+    book.save(args.output_path)
+    print(f"Saved an opening book of {book.count_nodes()} states to {args.output_path}")
@@ -0,0 +1,109 @@
+import copy
+from itertools import tee
+from typing import List, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.feedback import encode_words, create_feedback_patterns, feedback_from_pattern
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import solved_pattern
+from simulation.sharded_runner import SessionResult
+from solver.candidates import CandidateSet
+from solver.wordle_solver import WordleSolver, SolverContext
+
+
+class HistoryGroup:
+    # the targets which got the same feedback for the same guesses so far. a deterministic solver is in the same
+    # state for all of them, so the solver context is kept once per group
+
+    def __init__(self, solver: WordleSolver, context: SolverContext, answers: Optional[CandidateSet],
+                 targets: np.ndarray, guesses: List[str], remaining_sizes: List[int]):
+        self.solver = solver
+        self.context = context
+        self.answers = answers
+        self.targets = targets
+        self.guesses = guesses
+        self.remaining_sizes = remaining_sizes
+
+    @staticmethod
+    def create(solver: WordleSolver, answers: Optional[CandidateSet], targets: np.ndarray) -> 'HistoryGroup':
+        return HistoryGroup(solver, solver.create_context(), answers, targets, [], [])
+
+    def split(self, guess: str, targets_patterns: np.ndarray) -> Iterator[Tuple[int, 'HistoryGroup']]:
+        unique_patterns, inverse = np.unique(targets_patterns, return_inverse=True)
+        bounds = np.cumsum(np.bincount(inverse))[:-1]
+        groups_targets = np.split(self.targets[np.argsort(inverse, kind='stable')], bounds)
+        guesses = self.guesses + [guess]
+        # the remaining guesses of the group are consumed independently by every subgroup
+        guesses_iters = tee(self.context.guesses_iter, len(unique_patterns))
+        for pattern, guesses_iter, targets in zip(unique_patterns.tolist(), guesses_iters, groups_targets):
+            context = copy.copy(self.context)
+            context.guesses_iter = guesses_iter
+            self.solver.update_context(context, guess, feedback_from_pattern(guess, pattern))
+            answers = None if self.answers is None else self.answers.narrow(guess, pattern)
+            remaining_sizes = self.remaining_sizes if answers is None else self.remaining_sizes + [len(answers)]
+            yield pattern, HistoryGroup(self.solver, context, answers, targets, guesses, remaining_sizes)
+
+    def advance(self) -> Iterator[str]:
+        context = self.context
+        context.guesses_iter = self.solver.next_guesses(context)
+        return context.guesses_iter
+
+
+def get_answers_indices(targets: Sequence[str], patterns: Optional[PatternMatrix]) -> Optional[np.ndarray]:
+    # the columns of the targets in the patterns matrix, if all of them are answers of the matrix
+    if (patterns is None) or any(target not in patterns.answers_index for target in targets):
+        return None
+
+    return np.array([patterns.answers_index[target] for target in targets], dtype=np.intp)
+
+
+def compute_targets_patterns(guess: str, targets_indices: np.ndarray, encoded_targets: np.ndarray,
+                             patterns: Optional[PatternMatrix], answers_indices: Optional[np.ndarray]) -> np.ndarray:
+    if (answers_indices is not None) and (guess in patterns.guesses_index):
+        return patterns.matrix[patterns.guesses_index[guess], answers_indices[targets_indices]]
+
+    return create_feedback_patterns(encode_words([guess])[0], encoded_targets[targets_indices])
+
+
+def iter_lockstep_results(
+        targets: Sequence[str],
+        solver: WordleSolver,
+        max_guesses: int,
+        patterns: Optional[PatternMatrix] = None
+) -> Iterator[SessionResult]:
+    # solves all the targets together, a turn at a time: the next guess is computed once per distinct feedback
+    # history rather than once per target, then every group is split by the feedback pattern of its targets.
+    # the results are the ones of `solve_target` for a deterministic solver, yielded as the sessions end
+    targets = list(targets)
+    encoded_targets = encode_words(targets)
+    answers_indices = get_answers_indices(targets, patterns)
+    answers = None if patterns is None else CandidateSet.from_patterns(patterns)
+    target_solved = solved_pattern(encoded_targets.shape[1])
+    groups = [HistoryGroup.create(solver, answers, np.arange(len(targets)))]
+    n_guesses = 0
+    while len(groups) > 0:
+        n_guesses += 1
+        next_groups = []
+        for group in groups:
+            if n_guesses > max_guesses:
+                # the session would raise MaxTriesExceededError on this guess
+                for target in group.targets.tolist():
+                    yield SessionResult(targets[target], n_guesses, group.guesses, False, group.remaining_sizes)
+                continue
+
+            guess = next(group.context.guesses_iter)
+            targets_patterns = compute_targets_patterns(guess, group.targets, encoded_targets, patterns,
+                                                        answers_indices)
+            for pattern, subgroup in group.split(guess, targets_patterns):
+                if pattern == target_solved:
+                    for target in subgroup.targets.tolist():
+                        yield SessionResult(targets[target], n_guesses, subgroup.guesses, True,
+                                            subgroup.remaining_sizes)
+                    continue
+
+                if n_guesses < max_guesses:
+                    subgroup.advance()
+                next_groups.append(subgroup)
+
+        groups = next_groups
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+from typing import Dict, Set, List, Iterator
+
+import numpy as np
+
+DEFAULT_BATCH_SIZE = 64
+TRUNCATE_CHUNK_SIZE = 1 << 16
+
+
+def compute_config_hash(config: dict) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def iter_records(path: str, config_hash: str) -> Iterator[dict]:
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if len(line) == 0:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line of an interrupted run may be truncated
+                continue
+            if record.get("config_hash") == config_hash:
+                yield record
+
+
+def truncate_partial_line(path: str):
+    # drops a truncated last line of an interrupted run, so the appended records start on a line of their own
+    if not os.path.exists(path):
+        return
+
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            chunk_start = max(0, position - TRUNCATE_CHUNK_SIZE)
+            f.seek(chunk_start)
+            chunk = f.read(position - chunk_start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                position = chunk_start + newline + 1
+                break
+            position = chunk_start
+
+        if position < end:
+            f.truncate(position)
+
+
+class StreamingResultsWriter:
+    # appends a JSON line per session record, flushed every `batch_size` records. records are tagged with the hash
+    # of the run configuration, so a rerun of the same configuration skips the targets already recorded
+
+    def __init__(self, path: str, config: dict, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.config_hash = compute_config_hash(config)
+        self.batch_size = batch_size
+        self.completed_targets: Set[str] = {record["target"] for record in iter_records(path, self.config_hash)}
+        self.__batch: List[str] = []
+        truncate_partial_line(path)
+        self.__file = open(path, 'a')
+
+    def __enter__(self) -> 'StreamingResultsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def is_completed(self, target: str) -> bool:
+        return target in self.completed_targets
+
+    def write(self, record: Dict):
+        record = dict(record, config_hash=self.config_hash)
+        self.__batch.append(json.dumps(record))
+        self.completed_targets.add(record["target"])
+        if len(self.__batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.__batch) > 0:
+            self.__file.write("".join(f"{line}\n" for line in self.__batch))
+            self.__batch = []
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def close(self):
+        if not self.__file.closed:
+            self.flush()
+            self.__file.close()
+
+    def records(self) -> Iterator[dict]:
+        self.flush()
+        return iter_records(self.path, self.config_hash)
+
+
+def write_columnar_results(path: str, records: Iterator[dict]):
+    # per-turn remaining sizes are ragged, they are saved flattened with the offset of every session
+    targets, n_guesses, solved, remaining_sizes, remaining_offsets = [], [], [], [], [0]
+    for record in records:
+        targets.append(record["target"])
+        n_guesses.append(record["n_guesses"])
+        solved.append(record["solved"])
+        remaining_sizes.extend(record.get("remaining_sizes", []))
+        remaining_offsets.append(len(remaining_sizes))
+
+    np.savez(
+        path,
+        targets=np.array(targets, dtype=str),
+        n_guesses=np.array(n_guesses, dtype=np.int16),
+        solved=np.array(solved, dtype=bool),
+        remaining_sizes=np.array(remaining_sizes, dtype=np.int32),
+        remaining_offsets=np.array(remaining_offsets, dtype=np.int64),
+    )
+
+
+def load_columnar_results(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
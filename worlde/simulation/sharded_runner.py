@@ -0,0 +1,95 @@
+import multiprocessing
+from typing import List, NamedTuple, Iterator, Optional, Sequence
+
+from engine.auto_wordle_engine import PredefinedWordleSession, MaxTriesExceededError, AutoWordleEngine
+from engine.feedback import create_feedback_pattern
+from engine.pattern_matrix import PatternMatrix
+from solver.candidates import CandidateSet
+from solver.wordle_solver import WordleSolver
+
+DEFAULT_SHARD_SIZE = 16
+
+
+class SessionResult(NamedTuple):
+    target: str
+    n_guesses: int
+    guesses: List[str]
+    solved: bool
+    # the number of possible answers remaining after every guess (empty without a patterns matrix)
+    remaining_sizes: List[int]
+
+    def to_json(self) -> dict:
+        return self._asdict()
+
+
+class SharedState(NamedTuple):
+    solver: WordleSolver
+    max_guesses: int
+    patterns: Optional[PatternMatrix]
+    answers: Optional[CandidateSet]
+    hard_mode: bool
+
+
+# read-only state of a worker process, set once by the pool initializer.
+# with the fork start method it is inherited from the parent (copy-on-write) rather than rebuilt or pickled
+_shared_state: Optional[SharedState] = None
+
+
+def _init_worker(shared_state: SharedState):
+    global _shared_state
+    _shared_state = shared_state
+
+
+def _solve_shared_target(target: str) -> SessionResult:
+    return solve_target(target, *_shared_state)
+
+
+def solve_target(target: str, solver: WordleSolver, max_guesses: int,
+                 patterns: Optional[PatternMatrix] = None, answers: Optional[CandidateSet] = None,
+                 hard_mode: bool = False) -> SessionResult:
+    session = PredefinedWordleSession(target, max_guesses, patterns, hard_mode)
+    try:
+        n_guesses = solver.solve(session)
+    except MaxTriesExceededError:
+        n_guesses = max_guesses + 1
+
+    remaining_sizes = []
+    if answers is not None:
+        for guess in session.guesses:
+            answers = answers.narrow(guess, create_feedback_pattern(guess, target))
+            remaining_sizes.append(len(answers))
+
+    return SessionResult(target, n_guesses, list(session.guesses), session.is_solved(), remaining_sizes)
+
+
+def engine_targets(engine: AutoWordleEngine) -> List[str]:
+    # the answers in the (shuffled) order the engine would have played them
+    return [engine.possible_answers[i] for i in engine.answers_indices]
+
+
+def get_pool_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+
+    return multiprocessing.get_context()
+
+
+def iter_sharded_results(
+        targets: Sequence[str],
+        solver: WordleSolver,
+        max_guesses: int,
+        patterns: Optional[PatternMatrix] = None,
+        n_workers: int = 1,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        hard_mode: bool = False
+) -> Iterator[SessionResult]:
+    # results are yielded in the order of `targets`, whatever the number of workers is
+    answers = None if patterns is None else CandidateSet.from_patterns(patterns)
+    shared_state = SharedState(solver, max_guesses, patterns, answers, hard_mode)
+    if n_workers <= 1:
+        for target in targets:
+            yield solve_target(target, *shared_state)
+        return
+
+    with get_pool_context().Pool(n_workers, initializer=_init_worker, initargs=(shared_state,)) as pool:
+        yield from pool.imap(_solve_shared_target, targets, chunksize=shard_size)
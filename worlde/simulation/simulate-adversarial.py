@@ -0,0 +1,57 @@
+import argparse
+
+from engine import PatternMatrix, MaxTriesExceededError
+from engine.adversarial_wordle_engine import AdversarialWordleEngine, LargestBucketPolicy, RandomBucketPolicy
+from solver.entropy.lookahead_search import LookaheadSearch, DEFAULT_TURN_SECONDS
+from solver.simplified_entropy_solver import SimplifiedEntropySolver, RankingMode
+from utils import DEFAULT_WORD_LEN, load_words, load_wordslist, positive_int
+
+POLICIES = {
+    "largest": lambda seed: LargestBucketPolicy(),
+    "random": lambda seed: RandomBucketPolicy(seed),
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve against an adversary which keeps the answer open")
+    parser.add_argument("--policy", choices=list(POLICIES), default="largest")
+    parser.add_argument("--games", type=int, default=1, help="the largest bucket policy is deterministic")
+    parser.add_argument("--seed", type=int, default=1919)
+    parser.add_argument("--ranking-mode", choices=[mode.value for mode in RankingMode],
+                        default=RankingMode.LETTERS_HEURISTIC.value)
+    parser.add_argument("--hard-mode", action="store_true", help="every guess must use the revealed hints")
+    parser.add_argument("--turn-seconds", type=float, default=DEFAULT_TURN_SECONDS,
+                        help="the search time of every turn in the lookahead ranking mode")
+    parser.add_argument("--max-tries", type=int, default=10)
+    parser.add_argument("--words-path", default="../resources/allowed_words.txt", help="the allowed guesses list")
+    parser.add_argument("--answers-path", default="../resources/possible_words.txt", help="the possible answers list")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the word lists are skipped)")
+    args = parser.parse_args()
+
+    all_words = list(load_words(args.words_path, args.word_len))
+    possible_answers = load_wordslist(args.answers_path, args.word_len)
+    if (len(all_words) == 0) or (len(possible_answers) == 0):
+        parser.error(f"No words of {args.word_len} letters in the word lists")
+
+    patterns = PatternMatrix.load_or_compute(all_words, possible_answers)
+    engine = AdversarialWordleEngine(possible_answers, args.max_tries, POLICIES[args.policy](args.seed), patterns,
+                                     args.hard_mode)
+    lookahead = LookaheadSearch(patterns, turn_seconds=args.turn_seconds)
+    solver = SimplifiedEntropySolver(all_words, max_guesses=args.max_tries, patterns=patterns,
+                                     ranking_mode=RankingMode(args.ranking_mode), lookahead=lookahead,
+                                     hard_mode=args.hard_mode)
+
+    results = []
+    for i in range(args.games):
+        session = engine.new_session()
+        try:
+            n_guesses = solver.solve(session)
+        except MaxTriesExceededError:
+            n_guesses = args.max_tries + 1
+
+        results.append(n_guesses)
+        status_str = "Solved" if session.is_solved() else "Failed"
+        guesses = ",".join(session.guesses)
+        print(f"{i + 1}) {session.target}\t{status_str}!\t{n_guesses}\t{guesses}")
+
+    print(f"worst: {max(results)}, average: {sum(results) / len(results)}")
@@ -1,33 +1,131 @@
-from engine.auto_wordle_engine import AutoWordleEngine, MaxTriesExceededError
-from solver.simplified_entropy_solver import SimplifiedEntropySolver
-from utils import load_words, load_wordslist
+import argparse
+from contextlib import ExitStack
+
+from corpus import load_words_or_corpus
+from engine import PatternMatrix
+from engine.auto_wordle_engine import AutoWordleEngine
+from simulation.lockstep_runner import iter_lockstep_results
+from simulation.results_writer import StreamingResultsWriter, write_columnar_results
+from simulation.sharded_runner import iter_sharded_results, engine_targets
+from solver.endgame_solver import EndgameObjective
+from solver.entropy.lookahead_search import LookaheadSearch, DEFAULT_TURN_SECONDS
+from solver.instrumentation import InMemoryInstrumentation
+from solver.opening_book import OpeningBook
+from solver.ranking_cache import RankingCache
+from solver.simplified_entropy_solver import SimplifiedEntropySolver, RankingMode
+from utils import DEFAULT_WORD_LEN, load_wordslist, positive_int
 
 if __name__ == "__main__":
-    words_path = "../resources/allowed_words.txt"
-    POSSIBLE_ANSWERS_FILEPATH = "../resources/possible_words.txt"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ranking-mode", choices=[mode.value for mode in RankingMode],
+                        default=RankingMode.LETTERS_HEURISTIC.value)
+    parser.add_argument("--hard-mode", action="store_true", help="every guess must use the revealed hints")
+    parser.add_argument("--turn-seconds", type=float, default=DEFAULT_TURN_SECONDS,
+                        help="search time budget per turn of the lookahead ranking mode")
+    parser.add_argument("--prescreen-k", type=positive_int, default=None,
+                        help="rank only the top k guesses of a cheap pre-screen when falling back to the dictionary")
+    parser.add_argument("--prescreen-audit", action="store_true",
+                        help="also rank the whole dictionary, to report the pre-screen miss rate (with --metrics)")
+    parser.add_argument("--endgame-threshold", type=positive_int, default=None,
+                        help="search the optimal guess exhaustively once at most this many candidates remain")
+    parser.add_argument("--endgame-objective", choices=[objective.value for objective in EndgameObjective],
+                        default=EndgameObjective.EXPECTED.value)
+    parser.add_argument("--book", help="opening book path, compiled for the same options (see compile_opening_book)")
+    parser.add_argument("--cache-size", type=int, default=0, help="ranked guesses cache size (0 disables the cache)")
+    parser.add_argument("--cache-path", help="ranked guesses cache path, loaded at start and saved at exit "
+                                             "(single worker only)")
+    parser.add_argument("--metrics", action="store_true", help="print per-turn metrics (single worker only)")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="solve all the targets together, ranking once per distinct feedback history")
+    parser.add_argument("--output", help="results JSONL path, appended to and resumed from")
+    parser.add_argument("--columnar-output", help="path to also save the results as columnar arrays (.npz)")
+    parser.add_argument("--words-path", default="../resources/allowed_words.txt", help="the allowed guesses list")
+    parser.add_argument("--answers-path", default="../resources/possible_words.txt", help="the possible answers list")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the word lists are skipped)")
+    parser.add_argument("--corpus", help="a packed corpus of the allowed words (see corpus.py), memory-mapped rather "
+                                         "than parsed")
+    args = parser.parse_args()
+
     FREQS_PATH = "freq_map.json"
     max_guesses = 6
 
-    all_words = list(load_words(words_path))
-    possible_answers = load_wordslist(POSSIBLE_ANSWERS_FILEPATH)
+    all_words, encoded_words = load_words_or_corpus(args.words_path, args.corpus, args.word_len)
+    possible_answers = load_wordslist(args.answers_path, args.word_len)
+    if (len(all_words) == 0) or (len(possible_answers) == 0):
+        parser.error(f"No words of {args.word_len} letters in the word lists")
+
+    patterns = PatternMatrix.load_or_compute(all_words, possible_answers)
+    wordle_engine = AutoWordleEngine(possible_answers, all_words, patterns=patterns, hard_mode=args.hard_mode)
+    ranking_mode = RankingMode(args.ranking_mode)
+    ranking_cache = RankingCache(args.cache_size) if args.cache_size > 0 else None
+    instrumentation = InMemoryInstrumentation() if args.metrics else None
+    book = OpeningBook.load(args.book) if args.book else None
+    lookahead = LookaheadSearch(patterns, turn_seconds=args.turn_seconds)
+    solver = SimplifiedEntropySolver(all_words, max_guesses=6, patterns=patterns, ranking_mode=ranking_mode,
+                                     book=book, ranking_cache=ranking_cache, instrumentation=instrumentation,
+                                     lookahead=lookahead, hard_mode=args.hard_mode, prescreen_k=args.prescreen_k,
+                                     prescreen_audit=args.prescreen_audit, endgame_threshold=args.endgame_threshold,
+                                     endgame_objective=EndgameObjective(args.endgame_objective),
+                                     encoded_guesses=encoded_words)
+
+    if (ranking_cache is not None) and args.cache_path:
+        ranking_cache.load(args.cache_path, solver.ranking_config())
+
+    targets = engine_targets(wordle_engine)
+    # the results writer flushes the pending results and closes the file even if the run is interrupted
+    with ExitStack() as exit_stack:
+        writer = None
+        if args.output:
+            config = {
+                "solver": type(solver).__name__,
+                "ranking_mode": ranking_mode.value,
+                "max_guesses": max_guesses,
+                "words_hash": solver.words_hash,
+            }
+            if ranking_mode is RankingMode.LOOKAHEAD:
+                config["turn_seconds"] = args.turn_seconds
+            if args.hard_mode:
+                config["hard_mode"] = True
+            if args.prescreen_k is not None:
+                config["prescreen_k"] = args.prescreen_k
+            if args.endgame_threshold is not None:
+                config["endgame_threshold"] = args.endgame_threshold
+                config["endgame_objective"] = args.endgame_objective
+            writer = exit_stack.enter_context(StreamingResultsWriter(args.output, config))
+            targets = [target for target in targets if not writer.is_completed(target)]
+            print(f"Resuming: {len(writer.completed_targets)} targets already recorded")
 
-    wordle_engine = AutoWordleEngine(possible_answers, all_words)
-    solver = SimplifiedEntropySolver(all_words, max_guesses=6)
+        results = []
+        avg_n_guesses = 0
+        if args.lockstep:
+            results_iter = iter_lockstep_results(targets, solver, max_guesses, patterns)
+        else:
+            results_iter = iter_sharded_results(targets, solver, max_guesses, patterns, n_workers=args.workers,
+                                                hard_mode=args.hard_mode)
+        for result in results_iter:
+            if writer is not None:
+                writer.write(result.to_json())
 
-    results = []
-    avg_n_guesses = 0
-    while wordle_engine.has_next_word():
-        session = wordle_engine.new_session()
-        try:
-            n_guesses = solver.solve(session)
-        except MaxTriesExceededError:
-            n_guesses = max_guesses + 1
+            n_guesses = result.n_guesses
+            results.append(n_guesses)
+            avg_n_guesses = ((avg_n_guesses * (len(results) - 1)) + n_guesses) / len(results)
 
-        results.append(n_guesses)
-        avg_n_guesses = ((avg_n_guesses * (len(results) - 1)) + n_guesses) / len(results)
+            # status_str = "Solved" if session.is_solved() else "Failed"
+            status_str = "Solved" if n_guesses <= max_guesses else "Failed"
+            print(f"{len(results)}) {result.target}\t{status_str}!\t{n_guesses}\t({avg_n_guesses})")
 
-        # status_str = "Solved" if session.is_solved() else "Failed"
-        status_str = "Solved" if n_guesses <= max_guesses else "Failed"
-        print(f"{len(results)}) {session.target}\t{status_str}!\t{n_guesses}\t({avg_n_guesses})")
+        if (writer is not None) and args.columnar_output:
+            write_columnar_results(args.columnar_output, writer.records())
 
+    if (ranking_cache is not None) and (args.workers <= 1):
+        print(ranking_cache.stats())
+        if args.cache_path:
+            ranking_cache.save(args.cache_path, solver.ranking_config())
 
+    if (instrumentation is not None) and (args.workers <= 1):
+        for turn, turn_summary in instrumentation.summary().items():
+            print(turn, turn_summary)
+        for session_record in instrumentation.slowest_sessions():
+            print(session_record)
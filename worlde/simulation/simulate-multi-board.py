@@ -0,0 +1,44 @@
+import argparse
+
+from engine import PatternMatrix, MaxTriesExceededError
+from engine.multi_board_engine import MultiBoardEngine
+from solver.instrumentation import InMemoryInstrumentation
+from solver.multi_board_solver import MultiBoardSolver
+from utils import DEFAULT_WORD_LEN, load_words, load_wordslist, positive_int
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boards", type=int, default=4)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1919)
+    parser.add_argument("--words-path", default="../resources/allowed_words.txt", help="the allowed guesses list")
+    parser.add_argument("--answers-path", default="../resources/possible_words.txt", help="the possible answers list")
+    parser.add_argument("--word-len", type=positive_int, default=DEFAULT_WORD_LEN,
+                        help="the length of the words (the words of other lengths in the word lists are skipped)")
+    args = parser.parse_args()
+
+    all_words = list(load_words(args.words_path, args.word_len))
+    possible_answers = load_wordslist(args.answers_path, args.word_len)
+    if (len(all_words) == 0) or (len(possible_answers) == 0):
+        parser.error(f"No words of {args.word_len} letters in the word lists")
+
+    patterns = PatternMatrix.load_or_compute(all_words, possible_answers)
+    engine = MultiBoardEngine(possible_answers, args.boards, random_seed=args.seed, patterns=patterns)
+    instrumentation = InMemoryInstrumentation()
+    solver = MultiBoardSolver(patterns, instrumentation)
+
+    results = []
+    for i in range(args.games):
+        session = engine.new_session()
+        try:
+            n_guesses = solver.solve(session)
+        except MaxTriesExceededError:
+            n_guesses = session.max_tries + 1
+
+        results.append(n_guesses)
+        status_str = "Solved" if session.is_solved() else "Failed"
+        targets = ",".join(board.target for board in session.boards)
+        print(f"{i + 1}) {targets}\t{status_str}!\t{n_guesses}\t({sum(results) / len(results)})")
+
+    for turn, turn_summary in instrumentation.summary().items():
+        print(turn, turn_summary)
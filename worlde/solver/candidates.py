@@ -0,0 +1,52 @@
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+
+from engine.feedback import encode_words, create_feedback_patterns
+from engine.pattern_matrix import PatternMatrix
+
+
+class CandidateSet:
+    # the indices of the words which are still consistent with every feedback so far.
+    # `words`, `encoded_words` and `patterns` are shared (never copied) by all the sets narrowed from the same universe
+
+    def __init__(self, words: List[str], encoded_words: np.ndarray, indices: np.ndarray,
+                 patterns: Optional[PatternMatrix] = None):
+        self.universe = words
+        self.encoded_words = encoded_words
+        self.indices = indices
+        self.patterns = patterns
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def key(self) -> bytes:
+        # a canonical form of the set, stable across processes (the universe is assumed to be fixed)
+        return hashlib.sha1(self.indices.astype(np.int64, copy=False).tobytes()).digest()
+
+    def words(self) -> List[str]:
+        return [self.universe[i] for i in self.indices.tolist()]
+
+    def narrow(self, guess: str, pattern: int) -> 'CandidateSet':
+        patterns = self.patterns
+        if (patterns is not None) and (guess in patterns.guesses_index):
+            candidates_patterns = patterns.matrix[patterns.guesses_index[guess], self.indices]
+        else:
+            candidates_patterns = create_feedback_patterns(encode_words([guess])[0], self.encoded_words[self.indices])
+
+        return CandidateSet(self.universe, self.encoded_words, self.indices[candidates_patterns == pattern], patterns)
+
+    @staticmethod
+    def create(words: List[str], patterns: Optional[PatternMatrix] = None,
+               encoded_words: Optional[np.ndarray] = None) -> 'CandidateSet':
+        # with a patterns matrix, the words must be its answers (columns).
+        # `encoded_words` may be given to share already encoded letters, e.g. a memory-mapped corpus
+        if encoded_words is None:
+            encoded_words = encode_words(words)
+
+        return CandidateSet(words, encoded_words, np.arange(len(words)), patterns)
+
+    @staticmethod
+    def from_patterns(patterns: PatternMatrix) -> 'CandidateSet':
+        return CandidateSet.create(patterns.answers, patterns)
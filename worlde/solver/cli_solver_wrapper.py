@@ -1,9 +1,9 @@
-from typing import Iterator
+from typing import Iterator, Optional
 
 from itertools import chain
-from engine import WordleEngine
-from solver.constraints import Constraints
-from solver.wordle_solver import WordleSolver
+from engine import WordleEngine, GuessFeedback
+from solver.candidates import CandidateSet
+from solver.wordle_solver import WordleSolver, SolverContext
 
 
 VALID_INPUTS = {'c', 'n', 'i'}
@@ -53,11 +53,27 @@ class CliSolverWrapper(WordleSolver):
 
     def __init__(self, solver: WordleSolver):
         self.solver = solver
+        self.instrumentation = solver.instrumentation
 
-    def iter_first_guesses(self) -> Iterator[str]:
-        guesses = self.solver.iter_first_guesses()
+    @property
+    def context_class(self):
+        return self.solver.context_class
+
+    def iter_first_guesses(self, context: SolverContext) -> Iterator[str]:
+        guesses = self.solver.iter_first_guesses(context)
+        return select_first_then_iter(guesses)
+
+    def create_candidates(self) -> Optional[CandidateSet]:
+        return self.solver.create_candidates()
+
+    def on_feedback(self, context: SolverContext, feedback: GuessFeedback):
+        self.solver.on_feedback(context, feedback)
+
+    def iter_guesses(self, context: SolverContext) -> Iterator[str]:
+        guesses = self.solver.iter_guesses(context)
         return select_first_then_iter(guesses)
 
-    def iter_guesses(self, guesses_iter: Iterator[str], constraints: Constraints) -> Iterator[str]:
-        guesses = self.solver.iter_guesses(guesses_iter, constraints)
+    def next_guesses(self, context: SolverContext) -> Iterator[str]:
+        # the wrapped solver's endgame guess is suggested first
+        guesses = self.solver.next_guesses(context)
         return select_first_then_iter(guesses)
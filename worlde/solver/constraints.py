@@ -3,9 +3,14 @@ from enum import Enum
 from functools import partial
 from itertools import starmap
 from operator import itemgetter
-from typing import Sequence, Tuple, Callable, List, NamedTuple, Iterable, Iterator
+from typing import Sequence, Tuple, Callable, List, NamedTuple, Iterable, Iterator, Optional
 
-from engine import WordLettersAnnotations
+import numpy as np
+
+from engine.wordle_engine import EXACT_POS, FALSE_POS, FALSE_LETTER, decode_pattern_values
+from engine.feedback import ALPHABET_SIZE, encode_words, count_letters
+
+MAX_LETTER_COUNT = np.iinfo(np.uint8).max
 
 
 def make_constraints_must_exist(letters_min_count: Sequence[Tuple[str, int]]) -> Callable[[str], bool]:
@@ -55,6 +60,34 @@ def apply_constraints(word: str, constraints: List[Callable[[str], bool]]) -> bo
     return all(map(lambda c: c(word), constraints))
 
 
+def letter_index(letter: str) -> int:
+    return ord(letter) - ord('a')
+
+
+class CompiledConstraints(NamedTuple):
+    # allowed_letters[position, letter], and the min / max count of every letter in the word
+    allowed_letters: np.ndarray
+    min_counts: np.ndarray
+    max_counts: np.ndarray
+
+    def mask(self, encoded_words: np.ndarray, letters_counts: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(encoded_words), dtype=bool)
+        for position, allowed in enumerate(self.allowed_letters):
+            if not allowed.all():
+                mask &= allowed[encoded_words[:, position]]
+
+        for letter in np.flatnonzero(self.min_counts):
+            mask &= letters_counts[:, letter] >= self.min_counts[letter]
+
+        for letter in np.flatnonzero(self.max_counts < MAX_LETTER_COUNT):
+            mask &= letters_counts[:, letter] <= self.max_counts[letter]
+
+        return mask
+
+    def indices(self, encoded_words: np.ndarray, letters_counts: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(self.mask(encoded_words, letters_counts))
+
+
 class Constraints(NamedTuple):
     must_exist: List[Tuple[str, int]]
     must_not_exist: List[Tuple[str, int]]
@@ -71,10 +104,50 @@ class Constraints(NamedTuple):
         is_valid_word = partial(apply_constraints, constraints=constraints)
         yield from filter(is_valid_word, words)
 
-    def update(self, word: str, annotations: List[WordLettersAnnotations]) -> 'Constraints':
-        new_constraints = self.create(word, annotations)
+    def select_words(self, words: Sequence[str], encoded_words: Optional[np.ndarray] = None,
+                     letters_counts: Optional[np.ndarray] = None) -> List[str]:
+        # same as `filter_words`, evaluated at once over the encoded words. a list filtered repeatedly should come with
+        # its encoded letters and their `count_letters`, built once rather than on every call
+        words = list(words)
+        if len(words) == 0:
+            return words
 
-        must_not_exist = self.must_not_exist + new_constraints.must_not_exist
+        if encoded_words is None:
+            encoded_words = encode_words(words)
+        if letters_counts is None:
+            letters_counts = count_letters(encoded_words)
+
+        compiled = self.compile(encoded_words.shape[1])
+        return [words[i] for i in compiled.indices(encoded_words, letters_counts).tolist()]
+
+    def compile(self, word_len: int) -> CompiledConstraints:
+        allowed_letters = np.ones((word_len, ALPHABET_SIZE), dtype=bool)
+        min_counts = np.zeros(ALPHABET_SIZE, dtype=np.uint8)
+        max_counts = np.full(ALPHABET_SIZE, MAX_LETTER_COUNT, dtype=np.uint8)
+
+        for letter, position in self.exact_positions:
+            exact_letter = np.zeros(ALPHABET_SIZE, dtype=bool)
+            exact_letter[letter_index(letter)] = True
+            allowed_letters[position] &= exact_letter
+
+        for letter, positions in self.false_positions:
+            allowed_letters[list(positions), letter_index(letter)] = False
+
+        for letter, min_count in self.must_exist:
+            min_counts[letter_index(letter)] = max(min_counts[letter_index(letter)], min_count)
+
+        for letter, max_count in self.must_not_exist:
+            max_counts[letter_index(letter)] = min(max_counts[letter_index(letter)], max_count)
+
+        return CompiledConstraints(allowed_letters, min_counts, max_counts)
+
+    def update(self, word: str, pattern: int) -> 'Constraints':
+        new_constraints = self.create(word, pattern)
+
+        # keep a single (tightest) bound per letter, so the constraints do not grow with every update
+        must_not_exist = dict(self.must_not_exist)
+        for letter, max_count in new_constraints.must_not_exist:
+            must_not_exist[letter] = min(max_count, must_not_exist.get(letter, max_count))
 
         new_must_exists_letter_set = set(map(itemgetter(0), new_constraints.must_exist))
         relevant_current_must_exist = [(letter, min_count) for (letter, min_count) in self.must_exist
@@ -82,21 +155,27 @@ class Constraints(NamedTuple):
 
         must_exist = relevant_current_must_exist + new_constraints.must_exist
 
-        current_exact_positions_letter_set = set(map(itemgetter(0), self.exact_positions))
+        # a letter may be exact in several positions
+        current_exact_positions = set(self.exact_positions)
         exact_positions = self.exact_positions + [(letter, pos) for letter, pos in new_constraints.exact_positions
-                                                  if letter not in current_exact_positions_letter_set]
+                                                  if (letter, pos) not in current_exact_positions]
 
         false_positions = {letter: list(positions) for letter, positions in self.false_positions}
         for (letter, positions) in new_constraints.false_positions:
-            false_positions.setdefault(letter, []).extend(positions)
+            letter_positions = false_positions.setdefault(letter, [])
+            letter_positions.extend(position for position in positions if position not in letter_positions)
 
         return Constraints(
             must_exist,
-            must_not_exist,
+            list(must_not_exist.items()),
             exact_positions,
             list(false_positions.items())
         )
 
+    def hard_mode(self) -> 'Constraints':
+        # the constraints every guess must satisfy in hard mode: the revealed letters, and the exact ones in place
+        return Constraints(self.must_exist, [], self.exact_positions, [])
+
     @staticmethod
     def create_empty() -> 'Constraints':
         return Constraints([], [], [], [])
@@ -104,7 +183,7 @@ class Constraints(NamedTuple):
     @staticmethod
     def create(
             word: str,
-            annotations: List[WordLettersAnnotations],
+            pattern: int,
     ) -> 'Constraints':
 
         must_exist = Counter()
@@ -112,20 +191,21 @@ class Constraints(NamedTuple):
         exact_positions = []
         false_positions = {}
 
-        for index, letter in enumerate(word):
-            annotation = annotations[index]
-            if annotation == WordLettersAnnotations.FALSE_LETTER:
+        # the annotations digits of the pattern code
+        values = decode_pattern_values(pattern, len(word))
+        for index, (letter, value) in enumerate(zip(word, values)):
+            if value == FALSE_LETTER:
                 must_not_exist[letter] += 1
                 if must_exist[letter] >= 1:
                     false_positions.setdefault(letter, []).append(index)
-            elif annotation == WordLettersAnnotations.FALSE_POS:
+            elif value == FALSE_POS:
                 false_positions.setdefault(letter, []).append(index)
                 must_exist[letter] += 1
-            elif annotation == WordLettersAnnotations.EXACT_POS:
+            elif value == EXACT_POS:
                 exact_positions.append((letter, index))
                 must_exist[letter] += 1
             else:
-                raise AssertionError(f"Unsupported annotation in index {index} for word {word}: {annotation}")
+                raise AssertionError(f"Unsupported annotation in index {index} for word {word}: {value}")
 
         letters_counts = Counter(word)
         must_not_exist = [(letter, letters_counts[letter] - false_count) for letter, false_count in must_not_exist.items()]
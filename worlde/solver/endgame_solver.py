@@ -0,0 +1,178 @@
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from engine.feedback import encode_words, create_feedback_patterns
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import solved_pattern
+from solver.candidates import CandidateSet
+
+DEFAULT_ENDGAME_THRESHOLD = 20
+DEFAULT_MAX_MEMO_SIZE = 1 << 18
+
+
+class EndgameObjective(Enum):
+    # the expected number of guesses, over the candidates as equally likely targets
+    EXPECTED = "expected"
+    # the number of guesses of the worst target
+    WORST_CASE = "worst"
+
+
+class EndgameSolver:
+    # the optimal guess for a few remaining candidates, by an exhaustive search over all the guesses. the guesses
+    # with the same partition of the candidates are searched once, in the order of their lower bound, and a guess is
+    # pruned once its bound (or its partial cost) reaches the best one.
+    # the values of the candidate sets are memoized by their bitmask over the universe of the initial candidates,
+    # so all the sessions (and the subtrees of a search) which reach the same endgame share it
+
+    def __init__(self, guesses: List[str], initial_candidates: CandidateSet,
+                 threshold: int = DEFAULT_ENDGAME_THRESHOLD, objective: EndgameObjective = EndgameObjective.EXPECTED,
+                 max_memo_size: int = DEFAULT_MAX_MEMO_SIZE, patterns: Optional[PatternMatrix] = None):
+        # `patterns` defaults to the matrix of the candidates. the patterns of the candidates are taken from it if its
+        # rows are the guesses and the candidates are its answers, and computed otherwise
+        self.guesses = guesses
+        self.universe = initial_candidates.universe
+        self.patterns = patterns or initial_candidates.patterns
+        self.threshold = threshold
+        self.objective = objective
+        self.max_memo_size = max_memo_size
+        self.use_matrix = (self.patterns is not None) and (self.patterns.guesses == guesses)
+        self.encoded_guesses = encode_words(guesses)
+        # the patterns of the guesses with every candidate reached so far, by its index in the universe
+        self.__columns: Dict[int, np.ndarray] = {}
+        self.__memo: Dict[int, Tuple[float, int]] = {}
+
+    def applies(self, candidates: CandidateSet) -> bool:
+        return (candidates is not None) and (candidates.universe is self.universe) and \
+            (0 < len(candidates) <= self.threshold)
+
+    def best_guess(self, candidates: CandidateSet) -> Optional[str]:
+        # None if no guess can solve the candidates (none of them is a guess, and no guess splits them)
+        _, guess = self.evaluate(candidates)
+        return guess
+
+    def evaluate(self, candidates: CandidateSet) -> Tuple[float, Optional[str]]:
+        # the optimal value of the candidates (by the objective), and its guess
+        # the candidates patterns of every guess, the searched subsets are columns of it
+        if self.use_matrix and (candidates.patterns is self.patterns):
+            patterns = self.patterns.matrix[:, candidates.indices]
+        else:
+            patterns = self.__compute_columns(candidates)
+
+        solved = solved_pattern(len(self.guesses[0]))
+        search = _EndgameSearch(patterns, candidates.indices, solved, self.objective, self.__memo, self.max_memo_size)
+        value, guess = search.evaluate(list(range(len(candidates))))
+        return value, (self.guesses[guess] if guess >= 0 else None)
+
+    def __compute_columns(self, candidates: CandidateSet) -> np.ndarray:
+        columns = self.__columns
+        missing = [i for i in candidates.indices.tolist() if i not in columns]
+        if len(missing) > 0:
+            if len(columns) + len(missing) > self.max_memo_size:
+                columns.clear()
+            answers_index = self.patterns.answers_index if self.use_matrix else {}
+            for i in missing:
+                if self.universe[i] in answers_index:
+                    columns[i] = self.patterns.matrix[:, answers_index[self.universe[i]]]
+            missing = [i for i in missing if i not in columns]
+            if len(missing) > 0:
+                missing_patterns = create_feedback_patterns(self.encoded_guesses, candidates.encoded_words[missing])
+                columns.update(zip(missing, missing_patterns.T))
+        return np.stack([columns[i] for i in candidates.indices.tolist()], axis=1)
+
+
+class _EndgameSearch:
+
+    def __init__(self, patterns: np.ndarray, universe_indices: np.ndarray, solved: int, objective: EndgameObjective,
+                 memo: Dict[int, Tuple[float, int]], max_memo_size: int):
+        self.patterns = patterns
+        self.universe_indices = universe_indices.tolist()
+        self.solved = solved
+        self.expected = objective is EndgameObjective.EXPECTED
+        self.memo = memo
+        self.max_memo_size = max_memo_size
+
+    def evaluate(self, columns: List[int]) -> Tuple[float, int]:
+        # the optimal value of the candidates (columns), and its guess (row)
+        n_candidates = len(columns)
+        if n_candidates <= 2:
+            # guessing one of the candidates is optimal, if it is one of the guesses
+            candidate_guesses = np.flatnonzero(self.patterns[:, columns[0]] == self.solved)
+            if len(candidate_guesses) > 0:
+                guess = int(candidate_guesses[0])
+                if n_candidates == 1:
+                    return 1., guess
+                return (1.5 if self.expected else 2.), guess
+
+        key = sum(1 << self.universe_indices[column] for column in columns)
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+
+        value = self.__search(columns)
+        if len(self.memo) >= self.max_memo_size:
+            self.memo.clear()
+        self.memo[key] = value
+        return value
+
+    def __search(self, columns: List[int]) -> Tuple[float, int]:
+        n_candidates = len(columns)
+        partitions = self.patterns[:, columns]
+        sorted_partitions = np.sort(partitions, axis=1)
+        n_buckets = 1 + np.count_nonzero(sorted_partitions[:, 1:] != sorted_partitions[:, :-1], axis=1)
+        has_solved = (partitions == self.solved).any(axis=1)
+        # a bucket of n candidates takes at least 2 - 1/n more guesses on average (a guess which solves one of them
+        # and splits the rest), and 2 more guesses in the worst case if it has more than one candidate
+        n_unsolved_buckets = n_buckets - has_solved
+        if self.expected:
+            bounds = 1 + ((2 * (n_candidates - has_solved)) - n_unsolved_buckets) / n_candidates
+        else:
+            bounds = np.where(n_unsolved_buckets == n_candidates - has_solved, 2., 3.)
+        # the guesses which do not split the candidates are never searched
+        splits = has_solved | (n_buckets > 1)
+        order = np.lexsort((~has_solved, bounds))
+        order = order[splits[order]]
+
+        # only the first guess (of the dictionary) of every partition is searched
+        searched_partitions = set()
+        best_value, best_guess = np.inf, -1
+        for guess in order.tolist():
+            if bounds[guess] >= best_value:
+                break
+
+            partition = partitions[guess].tobytes()
+            if partition in searched_partitions:
+                continue
+            searched_partitions.add(partition)
+
+            value = self.__evaluate_partition(columns, partitions[guess].tolist(), bounds[guess], best_value)
+            if value < best_value:
+                best_value, best_guess = value, guess
+
+        return best_value, best_guess
+
+    def __evaluate_partition(self, columns: List[int], partition: List[int], bound: float, cutoff: float) -> float:
+        # the value of a guess, or any value not below `cutoff` once it cannot be better than it
+        n_candidates = len(columns)
+        buckets: Dict[int, List[int]] = {}
+        for column, pattern in zip(columns, partition):
+            buckets.setdefault(pattern, []).append(column)
+
+        # the largest buckets first, they are the most likely to exceed the cutoff
+        value = bound
+        for pattern, bucket in sorted(buckets.items(), key=lambda item: -len(item[1])):
+            count = len(bucket)
+            if (pattern == self.solved) or (count == 1):
+                # their bound is exact
+                continue
+
+            bucket_value, _ = self.evaluate(bucket)
+            if self.expected:
+                value += count * (bucket_value - (2. - (1. / count))) / n_candidates
+            else:
+                value = max(value, 1 + bucket_value)
+            if value >= cutoff:
+                return value
+
+        return value
@@ -5,6 +5,16 @@ from typing import Iterable, NamedTuple, Dict, List, Tuple, Sequence
 
 import numpy as np
 
+from engine.feedback import ALPHABET_SIZE, encode_words
+from solver.entropy.ranking import LazyRanking
+
+MAX_LETTER_REPEATS = 3
+
+
+def count_letter_repeats(word_len: int) -> int:
+    # the number of repeats counted per letter, a letter may repeat up to the word length
+    return max(MAX_LETTER_REPEATS, word_len)
+
 
 class LetterStats(NamedTuple):
     occur_prob: List[float]
@@ -25,9 +35,10 @@ def compute_letters_stats(words: List[str], weights: Dict[str, float] = None) ->
     letters_position_counts: Dict[str, List[int]] = {}
     letters_repeat_counts: Dict[str, List[int]] = {}
     all_letters = set(c for word in words for c in word)
+    word_len = max(map(len, words), default=0)
     for letter in all_letters:
-        letters_position_counts[letter] = [0 for _ in range(5)]
-        letters_repeat_counts[letter] = [0 for _ in range(3)]
+        letters_position_counts[letter] = [0 for _ in range(word_len)]
+        letters_repeat_counts[letter] = [0 for _ in range(count_letter_repeats(word_len))]
 
     for word in words:
         weight = weights.get(word, 1)
@@ -91,13 +102,76 @@ def compute_word_entropy_sum(word: str, letters_stats: Dict[str, LetterStats]) -
     return entropy_sum
 
 
-def sort_by_info_gain(allowed_words: List[str], target_words: List[str] = None, weights: Dict[str, float] = None) -> List[Tuple[str, float]]:
+def compute_repeat_indices(encoded_words: np.ndarray) -> np.ndarray:
+    # the number of earlier occurrences of the letter of every position in its word
+    repeats = np.zeros(encoded_words.shape, dtype=np.intp)
+    for i in range(1, encoded_words.shape[1]):
+        repeats[:, i] = (encoded_words[:, :i] == encoded_words[:, i, None]).sum(axis=1)
+
+    return repeats
+
+
+def compute_letters_counts(encoded_words: np.ndarray, weights: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, float]:
+    # the (weighted) positional counts (26 x word_len) and repeat counts (26 x repeats) of `compute_letters_stats`.
+    # bincount accumulates every bin in the words order, so the sums are the same as the sequential ones
+    n_words, word_len = encoded_words.shape
+    letters = encoded_words.astype(np.intp)
+    words_weights = None if weights is None else np.repeat(np.asarray(weights, dtype=np.float64), word_len)
+
+    position_bins = (letters * word_len) + np.arange(word_len)
+    position_counts = np.bincount(position_bins.ravel(), weights=words_weights, minlength=ALPHABET_SIZE * word_len)
+
+    n_repeats = count_letter_repeats(word_len)
+    repeat_bins = (letters * n_repeats) + compute_repeat_indices(encoded_words)
+    repeat_counts = np.bincount(repeat_bins.ravel(), weights=words_weights, minlength=ALPHABET_SIZE * n_repeats)
+
+    words_count = n_words if weights is None else (np.cumsum(weights)[-1] if n_words > 0 else 0)
+    return (position_counts.reshape(ALPHABET_SIZE, word_len).astype(np.float64),
+            repeat_counts.reshape(ALPHABET_SIZE, n_repeats).astype(np.float64),
+            words_count)
+
+
+def entropy_term(p: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(p != 0, p * np.log2(p), 0.)
+
+
+def compute_words_entropy_sums(encoded_words: np.ndarray, encoded_targets: np.ndarray,
+                               targets_weights: np.ndarray = None) -> np.ndarray:
+    # `compute_word_entropy_sum` of every word at once, with the same floating point operations (and order)
+    position_counts, repeat_counts, words_count = compute_letters_counts(encoded_targets, targets_weights)
+    occur_counts = repeat_counts[:, :1]
+    has_stats = occur_counts[:, 0] > 0
+    repeat_probs = repeat_counts / words_count
+    position_probs = np.divide(position_counts, occur_counts, out=np.zeros_like(position_counts),
+                               where=occur_counts > 0)
+
+    letters = encoded_words.astype(np.intp)
+    repeats = compute_repeat_indices(encoded_words)
+    entropy_sums = np.zeros(len(encoded_words))
+    for i in range(encoded_words.shape[1]):
+        letter = letters[:, i]
+        position_prob = position_probs[letter, i]
+        repeat_prob = repeat_probs[letter, repeats[:, i]]
+        exact_prob = repeat_probs[letter, 0] * position_prob
+        other_pos_prob = repeat_prob - (repeat_prob * position_prob)
+        not_exist_prob = 1 - repeat_prob
+        entropy = (entropy_term(exact_prob) + entropy_term(other_pos_prob)) + entropy_term(not_exist_prob)
+        entropy_sums += np.where(has_stats[letter], -entropy, 0.)
+
+    return entropy_sums
+
+
+def rank_by_info_gain(allowed_words: List[str], target_words: List[str] = None, weights: Dict[str, float] = None) -> LazyRanking:
     weights = weights or {}
     target_words = target_words or allowed_words
-    letters_stats = compute_letters_stats(target_words, weights)
-    words_log_prob = [(word, compute_word_entropy_sum(word, letters_stats)) for word in allowed_words]
-    sorted_words = sorted(words_log_prob, key=itemgetter(1), reverse=True)
-    return sorted_words
+    targets_weights = np.array([weights.get(word, 1) for word in target_words], dtype=np.float64) if weights else None
+    entropy_sums = compute_words_entropy_sums(encode_words(allowed_words), encode_words(target_words), targets_weights)
+    return LazyRanking(allowed_words, entropy_sums)
+
+
+def sort_by_info_gain(allowed_words: List[str], target_words: List[str] = None, weights: Dict[str, float] = None) -> List[Tuple[str, float]]:
+    return list(rank_by_info_gain(allowed_words, target_words, weights).iter_with_scores())
 
 
 def load_word_probs(path: str) -> Iterable[Tuple[str, List[float]]]:
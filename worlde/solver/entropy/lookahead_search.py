@@ -0,0 +1,133 @@
+import time
+from itertools import islice
+from math import log2, inf
+from typing import Dict, Tuple, Optional, Sequence, List
+
+import numpy as np
+
+from engine.pattern_matrix import PatternMatrix
+from solver.entropy.partition_entropy import rank_by_partition_entropy
+
+DEFAULT_WIDTH = 8
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_TURN_SECONDS = 0.5
+DEFAULT_MAX_MEMO_SIZE = 1 << 18
+# the information a guess is assumed to reveal beyond the search depth
+LEAF_BITS_PER_GUESS = 4.
+
+
+class SearchDeadlineExceeded(Exception):
+    pass
+
+
+def min_expected_guesses(n_candidates: int) -> float:
+    # a guess solves at most one of the candidates, every other candidate takes at least one more guess
+    return 2. - (1. / n_candidates)
+
+
+def estimate_expected_guesses(n_candidates: int) -> float:
+    if n_candidates == 1:
+        return 1.
+
+    return min_expected_guesses(n_candidates) + (log2(n_candidates / 2) / LEAF_BITS_PER_GUESS)
+
+
+class LookaheadSearch:
+    # depth-limited search of the guess minimizing the expected number of guesses to solve, over the top `width`
+    # guesses by partition entropy at every state. the expected number of guesses of the states beyond the depth
+    # is estimated from their size. the search is anytime: the depth is increased until the deadline of the turn,
+    # and the best guess of the deepest completed search is kept.
+    # the values of the states are memoized by (candidates, depth), they do not depend on the turn or the session
+
+    def __init__(self, patterns: PatternMatrix, width: int = DEFAULT_WIDTH, max_depth: int = DEFAULT_MAX_DEPTH,
+                 turn_seconds: float = DEFAULT_TURN_SECONDS, max_memo_size: int = DEFAULT_MAX_MEMO_SIZE):
+        self.patterns = patterns
+        self.width = width
+        self.max_depth = max_depth
+        self.turn_seconds = turn_seconds
+        self.max_memo_size = max_memo_size
+        self.solved_pattern = patterns.n_patterns - 1
+        self.__memo: Dict[Tuple[bytes, int], Tuple[float, str]] = {}
+
+    def search(self, candidates_indices: Sequence[int]) -> Tuple[Optional[str], int]:
+        # the best guess and the depth it was searched to, (None, 0) if not even depth 1 was completed in time
+        deadline = time.perf_counter() + self.turn_seconds
+        candidates_indices = np.sort(np.asarray(candidates_indices, dtype=np.intp))
+        best_guess, completed_depth = None, 0
+        try:
+            for depth in range(1, self.max_depth + 1):
+                _, best_guess = self.__evaluate(candidates_indices, depth, deadline, best_guess)
+                completed_depth = depth
+        except SearchDeadlineExceeded:
+            pass
+
+        return best_guess, completed_depth
+
+    def expected_guesses(self, candidates_indices: Sequence[int], depth: int) -> float:
+        candidates_indices = np.sort(np.asarray(candidates_indices, dtype=np.intp))
+        return self.__evaluate(candidates_indices, depth, inf)[0]
+
+    def __evaluate(self, candidates_indices: np.ndarray, depth: int, deadline: float,
+                   first_guess: Optional[str] = None) -> Tuple[float, Optional[str]]:
+        n_candidates = len(candidates_indices)
+        if n_candidates <= 2:
+            # guessing one of the candidates is optimal
+            return min_expected_guesses(n_candidates), self.patterns.answers[candidates_indices[0]]
+
+        if depth == 0:
+            return estimate_expected_guesses(n_candidates), None
+
+        key = (candidates_indices.tobytes(), depth)
+        value = self.__memo.get(key)
+        if value is not None:
+            return value
+
+        if time.perf_counter() > deadline:
+            raise SearchDeadlineExceeded()
+
+        best_cost, best_guess = inf, None
+        for guess in self.__top_guesses(candidates_indices, first_guess):
+            cost = self.__evaluate_guess(guess, candidates_indices, depth, deadline, best_cost)
+            if cost < best_cost:
+                best_cost, best_guess = cost, guess
+
+        if len(self.__memo) >= self.max_memo_size:
+            self.__memo.clear()
+        self.__memo[key] = (best_cost, best_guess)
+        return best_cost, best_guess
+
+    def __top_guesses(self, candidates_indices: np.ndarray, first_guess: Optional[str]) -> List[str]:
+        guesses = list(islice(rank_by_partition_entropy(self.patterns, candidates_indices), self.width))
+        if first_guess is not None:
+            # the best guess of the shallower search first, so the rest are pruned earlier
+            guesses = [first_guess] + [guess for guess in guesses if guess != first_guess]
+
+        return guesses
+
+    def __evaluate_guess(self, guess: str, candidates_indices: np.ndarray, depth: int, deadline: float,
+                         cutoff: float) -> float:
+        # the expected number of guesses, or any value not below `cutoff` once it cannot be better than it
+        n_candidates = len(candidates_indices)
+        candidates_patterns = self.patterns.matrix[self.patterns.guesses_index[guess], candidates_indices]
+        order = np.argsort(candidates_patterns, kind='stable')
+        buckets_patterns, starts, counts = np.unique(candidates_patterns[order], return_index=True,
+                                                     return_counts=True)
+        unsolved = buckets_patterns != self.solved_pattern
+        starts, counts = starts[unsolved], counts[unsolved]
+        # the largest buckets first, they are the most likely to exceed the cutoff
+        by_size = np.argsort(-counts, kind='stable')
+        starts, counts = starts[by_size].tolist(), counts[by_size].tolist()
+
+        remaining_bound = sum(count * min_expected_guesses(count) for count in counts) / n_candidates
+        cost = 1.
+        if cost + remaining_bound >= cutoff:
+            return cost + remaining_bound
+
+        for start, count in zip(starts, counts):
+            remaining_bound -= count * min_expected_guesses(count) / n_candidates
+            bucket = np.sort(candidates_indices[order[start: start + count]])
+            cost += count * self.__evaluate(bucket, depth - 1, deadline)[0] / n_candidates
+            if cost + remaining_bound >= cutoff:
+                return cost + remaining_bound
+
+        return cost
@@ -0,0 +1,192 @@
+from typing import List, Tuple, Optional, Sequence, Callable
+
+import numpy as np
+
+from engine.pattern_matrix import PatternMatrix
+from solver.entropy.ranking import LazyRanking
+
+ENTROPY_DECIMALS = 9
+# guesses are bucketed in blocks, so the buckets table of a block stays in cache
+GUESSES_BLOCK_SIZE = 256
+MAX_BLOCK_BUCKETS = GUESSES_BLOCK_SIZE * (3 ** 5)
+# the buckets are counted in a dense table up to 5 letters words. for longer words, when most of the table would be
+# empty (many more patterns than candidates), the buckets are counted by sorting their ids instead
+MAX_ALWAYS_DENSE_PATTERNS = 3 ** 5
+SPARSE_BUCKETS_RATIO = 4
+
+
+def use_dense_buckets(n_patterns: int, n_candidates: int) -> bool:
+    return n_patterns <= max(MAX_ALWAYS_DENSE_PATTERNS, SPARSE_BUCKETS_RATIO * n_candidates)
+
+
+def guesses_block_size(n_guess_buckets: int, dense: bool) -> int:
+    if not dense:
+        return GUESSES_BLOCK_SIZE
+
+    return max(1, min(GUESSES_BLOCK_SIZE, MAX_BLOCK_BUCKETS // n_guess_buckets))
+
+
+def sum_buckets(buckets_ids: np.ndarray, n_rows: int, n_row_buckets: int, bucket_value: Callable[[np.ndarray], np.ndarray],
+                weights: Optional[np.ndarray] = None, dense: bool = True) -> np.ndarray:
+    # the sum of `bucket_value(size)` over the buckets of every row. an item falls in the bucket
+    # row * n_row_buckets + pattern, and the size of a bucket is the number (or the total weight) of its items.
+    # the value of an empty bucket must be 0
+    if dense:
+        sizes = np.bincount(buckets_ids, weights=weights, minlength=n_rows * n_row_buckets)
+        return bucket_value(sizes).reshape(n_rows, n_row_buckets).sum(axis=1)
+
+    order = np.argsort(buckets_ids, kind='stable')
+    sorted_ids = buckets_ids[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_ids[1:] != sorted_ids[:-1])))
+    if weights is None:
+        sizes = np.diff(np.append(starts, len(sorted_ids)))
+    else:
+        sizes = np.add.reduceat(weights[order], starts)
+
+    return np.bincount(sorted_ids[starts] // n_row_buckets, weights=bucket_value(sizes), minlength=n_rows)
+
+
+def compute_partition_entropies(patterns: np.ndarray, n_patterns: int, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    # `patterns` holds a row of pattern codes per guess, and a column per candidate.
+    # the candidates of every guess in a block are bucketed by their patterns at once
+    n_guesses, n_candidates = patterns.shape
+    entropies = np.zeros(n_guesses)
+    if n_candidates == 0:
+        return entropies
+
+    if (weights is not None) and (np.sum(weights) <= 0):
+        weights = None
+
+    dense = use_dense_buckets(n_patterns, n_candidates)
+    block_size = guesses_block_size(n_patterns, dense)
+    offsets = np.arange(block_size, dtype=np.intp)[:, None] * n_patterns
+    if weights is None:
+        # H = log2(N) - sum(c * log2(c)) / N, with c * log2(c) looked up for every possible bucket size
+        counts = np.arange(n_candidates + 1, dtype=np.float64)
+        counts[0] = 1
+        count_log_count = counts * np.log2(counts)
+
+        def bucket_value(sizes: np.ndarray) -> np.ndarray:
+            return count_log_count[sizes]
+    else:
+        weights = np.asarray(weights, dtype=np.float64)
+        total_weight = weights.sum()
+
+        def bucket_value(sizes: np.ndarray) -> np.ndarray:
+            probs = sizes / total_weight
+            log_probs = np.log2(probs, out=np.zeros_like(probs), where=probs > 0)
+            return -(probs * log_probs)
+
+    for start in range(0, n_guesses, block_size):
+        block = patterns[start: start + block_size]
+        n_block = len(block)
+        buckets_ids = (block + offsets[:n_block]).ravel(order='K')
+        block_weights = None if weights is None else np.broadcast_to(weights, block.shape).ravel(order='K')
+        entropies[start: start + n_block] = sum_buckets(buckets_ids, n_block, n_patterns, bucket_value, block_weights,
+                                                        dense)
+
+    if weights is None:
+        entropies = np.log2(n_candidates) - (entropies / n_candidates)
+
+    return entropies
+
+
+def compute_joint_partition_entropies(patterns: np.ndarray, boards_sizes: Sequence[int], n_patterns: int,
+                                      boards_multiplicities: Optional[Sequence[int]] = None) -> np.ndarray:
+    # the expected information of every guess over several boards with independent targets, which is the sum of the
+    # boards entropies. `patterns` holds the candidates columns of all the boards, board after board, and the
+    # candidates of all the boards are bucketed together, by (guess, board, pattern), at once for a block of guesses
+    n_guesses, n_columns = patterns.shape
+    entropies = np.zeros(n_guesses)
+    if n_columns == 0:
+        return entropies
+
+    boards_sizes = np.asarray(boards_sizes, dtype=np.intp)
+    n_boards = len(boards_sizes)
+    if boards_multiplicities is None:
+        boards_multiplicities = np.ones(n_boards)
+    boards_multiplicities = np.asarray(boards_multiplicities, dtype=np.float64)
+
+    n_buckets = n_boards * n_patterns
+    columns_offsets = np.repeat(np.arange(n_boards, dtype=np.intp) * n_patterns, boards_sizes)
+    dense = use_dense_buckets(n_patterns, boards_sizes.max())
+    block_size = guesses_block_size(n_buckets, dense)
+    offsets = np.arange(block_size, dtype=np.intp)[:, None] * n_buckets
+    counts = np.arange(boards_sizes.max() + 1, dtype=np.float64)
+    counts[0] = 1
+    count_log_count = counts * np.log2(counts)
+    boards_max_entropies = np.log2(boards_sizes)
+
+    for start in range(0, n_guesses, block_size):
+        block = patterns[start: start + block_size]
+        n_block = len(block)
+        buckets_ids = (block + columns_offsets + offsets[:n_block]).ravel()
+        boards_sums = sum_buckets(buckets_ids, n_block * n_boards, n_patterns, count_log_count.__getitem__,
+                                  dense=dense)
+        boards_sums = boards_sums.reshape(n_block, n_boards)
+        boards_entropies = boards_max_entropies - (boards_sums / boards_sizes)
+        entropies[start: start + n_block] = boards_entropies @ boards_multiplicities
+
+    return entropies
+
+
+def rank_by_partition_entropy(
+        patterns: PatternMatrix,
+        candidates_indices: Sequence[int],
+        weights: Optional[np.ndarray] = None,
+        guesses_indices: Optional[np.ndarray] = None
+) -> LazyRanking:
+    # `guesses_indices` restricts the ranking to some of the guesses (rows) of the matrix, e.g. the legal ones
+    candidates_indices = np.asarray(candidates_indices, dtype=np.intp)
+    n_patterns = patterns.n_patterns
+    candidates_weights = None if weights is None else weights[candidates_indices]
+    candidates_patterns = patterns.matrix[:, candidates_indices]
+    if guesses_indices is not None:
+        candidates_patterns = candidates_patterns[guesses_indices]
+    entropies = compute_partition_entropies(candidates_patterns, n_patterns, candidates_weights)
+
+    # among guesses with the same entropy prefer the ones which might be the target itself
+    is_candidate = np.zeros(len(patterns.guesses), dtype=bool)
+    candidates_words = (patterns.answers[i] for i in candidates_indices)
+    is_candidate[[patterns.guesses_index[w] for w in candidates_words if w in patterns.guesses_index]] = True
+    guesses = patterns.guesses
+    if guesses_indices is not None:
+        guesses = [guesses[i] for i in guesses_indices.tolist()]
+        is_candidate = is_candidate[guesses_indices]
+
+    return LazyRanking(guesses, np.round(entropies, ENTROPY_DECIMALS), tie_breaker=~is_candidate)
+
+
+def sort_by_partition_entropy(
+        patterns: PatternMatrix,
+        candidates_indices: Sequence[int],
+        weights: Optional[np.ndarray] = None
+) -> List[Tuple[str, float]]:
+    return list(rank_by_partition_entropy(patterns, candidates_indices, weights).iter_with_scores())
+
+
+def rank_by_joint_partition_entropy(patterns: PatternMatrix, boards_candidates: Sequence[np.ndarray]) -> LazyRanking:
+    # the guesses by their joint expected information over the boards, plus the expected number of boards they solve.
+    # boards with the same candidates (e.g. all of them on the first turn) are scored once
+    unique_boards = {}
+    for candidates_indices in boards_candidates:
+        candidates_indices = np.asarray(candidates_indices, dtype=np.intp)
+        if len(candidates_indices) > 0:
+            unique_boards.setdefault(candidates_indices.tobytes(), []).append(candidates_indices)
+
+    boards = [same_boards[0] for same_boards in unique_boards.values()]
+    multiplicities = [len(same_boards) for same_boards in unique_boards.values()]
+    n_patterns = patterns.n_patterns
+    scores = np.zeros(len(patterns.guesses))
+    if len(boards) > 0:
+        columns = np.concatenate(boards)
+        scores = compute_joint_partition_entropies(patterns.matrix[:, columns], [len(board) for board in boards],
+                                                   n_patterns, multiplicities)
+
+    guesses_index = patterns.guesses_index
+    for board, multiplicity in zip(boards, multiplicities):
+        candidates_words = (patterns.answers[i] for i in board.tolist())
+        rows = [guesses_index[word] for word in candidates_words if word in guesses_index]
+        scores[rows] += multiplicity / len(board)
+
+    return LazyRanking(patterns.guesses, np.round(scores, ENTROPY_DECIMALS))
@@ -0,0 +1,78 @@
+import threading
+from typing import Sequence, Iterator, Optional, List, Tuple
+
+import numpy as np
+
+DEFAULT_FIRST_K = 16
+EXPANSION_FACTOR = 8
+
+
+class LazyRanking:
+    # the words ordered by descending score, then by ascending tie breaker, then by their original order
+    # (as a stable sort would). only the top-k are selected and sorted at first (with a partial partition),
+    # and the rest is expanded on demand. the selected prefix is kept, so iterating again is free.
+    # a cached ranking may be iterated by several threads, so the expansion is done under a lock
+
+    def __init__(self, words: Sequence[str], scores: np.ndarray, tie_breaker: Optional[np.ndarray] = None,
+                 first_k: int = DEFAULT_FIRST_K):
+        self.words = words
+        self.scores = np.asarray(scores)
+        self.tie_breaker = tie_breaker
+        self.next_k = first_k
+        self.__ordered: List[int] = []
+        self.__remaining = np.arange(len(words))
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_LazyRanking__lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.words[i] for i in self.__iter_indices())
+
+    def iter_with_scores(self) -> Iterator[Tuple[str, float]]:
+        return ((self.words[i], float(self.scores[i])) for i in self.__iter_indices())
+
+    def __iter_indices(self) -> Iterator[int]:
+        position = 0
+        while True:
+            while position < len(self.__ordered):
+                yield self.__ordered[position]
+                position += 1
+
+            with self.__lock:
+                if position < len(self.__ordered):
+                    # expanded by another iteration meanwhile
+                    continue
+                if len(self.__remaining) == 0:
+                    return
+
+                self.__expand()
+
+    def __expand(self):
+        remaining = self.__remaining
+        negated_scores = -self.scores[remaining]
+        if self.next_k < len(remaining):
+            # every word scored as the k-th one is selected as well, so ties are ordered exactly
+            threshold = np.partition(negated_scores, self.next_k - 1)[self.next_k - 1]
+            selected = negated_scores <= threshold
+        else:
+            selected = np.ones(len(remaining), dtype=bool)
+
+        selected_indices = remaining[selected]
+        if self.tie_breaker is None:
+            order = np.argsort(negated_scores[selected], kind='stable')
+        else:
+            order = np.lexsort((self.tie_breaker[selected_indices], negated_scores[selected]))
+
+        self.__ordered.extend(selected_indices[order].tolist())
+        self.__remaining = remaining[~selected]
+        self.next_k *= EXPANSION_FACTOR
@@ -0,0 +1,97 @@
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from engine.feedback import ALPHABET_SIZE, encode_words, count_letters
+from solver.entropy.letters_stats import entropy_term, compute_words_entropy_sums
+from solver.entropy.ranking import LazyRanking
+
+DEFAULT_PRESCREEN_K = 256
+
+
+def binary_entropies(p: np.ndarray) -> np.ndarray:
+    return -(entropy_term(p) + entropy_term(1 - p))
+
+
+def encode_letters_presence(encoded_words: np.ndarray) -> np.ndarray:
+    # presence[word, letter] is 1 if the letter is in the word
+    presence = np.zeros((len(encoded_words), ALPHABET_SIZE))
+    presence[np.arange(len(encoded_words))[:, None], encoded_words] = 1.
+    return presence
+
+
+class PrescreenedRanking(NamedTuple):
+    ranking: LazyRanking
+    # the indices (in the ranked guesses) of the guesses which were scored by the information gain
+    prescreened: np.ndarray
+
+
+class TwoStageRanker:
+    # ranks the whole dictionary against the remaining targets in two stages: a cheap letters coverage score
+    # pre-screens the top k guesses, and only those are scored by the letters information gain (see
+    # `rank_by_info_gain`). the targets themselves are pre-screened as well when there are at most k of them, the
+    # coverage misses them in the endgame. the rest of the guesses follow, by their coverage score.
+    # the dictionary is encoded once
+
+    def __init__(self, words: List[str], k: int = DEFAULT_PRESCREEN_K):
+        if k < 1:
+            raise ValueError(f"The pre-screen must keep at least one guess, got k={k}")
+
+        self.words = words
+        self.k = k
+        self.encoded_words = encode_words(words)
+        self.letters_presence = encode_letters_presence(self.encoded_words)
+        self.words_index = {word: i for i, word in enumerate(words)}
+
+    def coverage_scores(self, encoded_targets: np.ndarray, words_indices: Optional[np.ndarray] = None) -> np.ndarray:
+        # the information of the presence of the guess letters in the target, plus the one of the guess letters in
+        # their positions, as if all of them were independent
+        n_targets = len(encoded_targets)
+        targets_presence = np.count_nonzero(count_letters(encoded_targets), axis=0) / n_targets
+        letters_presence, encoded_words = self.letters_presence, self.encoded_words
+        if words_indices is not None:
+            letters_presence, encoded_words = letters_presence[words_indices], encoded_words[words_indices]
+
+        scores = letters_presence @ binary_entropies(targets_presence)
+        for position in range(encoded_targets.shape[1]):
+            position_probs = np.bincount(encoded_targets[:, position], minlength=ALPHABET_SIZE) / n_targets
+            scores += binary_entropies(position_probs)[encoded_words[:, position]]
+
+        return scores
+
+    def rank(self, targets: Sequence[str], guesses_indices: Optional[np.ndarray] = None) -> PrescreenedRanking:
+        # `guesses_indices` restricts the ranking to some of the words, e.g. the legal ones
+        encoded_targets = encode_words(targets)
+        words = self.words if guesses_indices is None else [self.words[i] for i in guesses_indices.tolist()]
+        coverage = self.coverage_scores(encoded_targets, guesses_indices)
+        if self.k < len(words):
+            prescreened = np.argpartition(-coverage, self.k - 1)[:self.k]
+            if len(targets) <= self.k:
+                prescreened = np.union1d(prescreened, self.__targets_positions(targets, guesses_indices))
+        else:
+            prescreened = np.arange(len(words))
+
+        # the pre-screened guesses are ordered as `rank_by_info_gain` orders them. the rest follow by their coverage,
+        # shifted below every information gain (which is not negative)
+        scores = coverage - (np.max(coverage, initial=0.) + 1.)
+        encoded_prescreened = self.encoded_words[prescreened if guesses_indices is None
+                                                 else guesses_indices[prescreened]]
+        scores[prescreened] = compute_words_entropy_sums(encoded_prescreened, encoded_targets)
+        return PrescreenedRanking(LazyRanking(words, scores), prescreened)
+
+    def __targets_positions(self, targets: Sequence[str], guesses_indices: Optional[np.ndarray]) -> np.ndarray:
+        # the positions of the targets in the ranked guesses
+        targets_indices = np.array([self.words_index[word] for word in targets if word in self.words_index],
+                                   dtype=np.intp)
+        if guesses_indices is None:
+            return targets_indices
+
+        return np.flatnonzero(np.isin(guesses_indices, targets_indices))
+
+    def is_prescreen_miss(self, result: PrescreenedRanking, targets: Sequence[str],
+                          guesses_indices: Optional[np.ndarray] = None) -> bool:
+        # whether a guess which was not pre-screened has a higher information gain than the pick (a guess as good as
+        # the pick is not a miss). it scores all the guesses, so it is meant for sampling the quality of the pre-screen
+        encoded_words = self.encoded_words if guesses_indices is None else self.encoded_words[guesses_indices]
+        scores = compute_words_entropy_sums(encoded_words, encode_words(targets))
+        return bool(np.max(scores) > np.max(result.ranking.scores[result.prescreened]))
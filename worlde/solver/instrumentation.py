@@ -0,0 +1,118 @@
+from collections import defaultdict
+from operator import attrgetter
+from typing import NamedTuple, Optional, List, Dict
+
+from engine.wordle_engine import WordleSessionEngine
+
+
+class TurnRecord(NamedTuple):
+    turn: int
+    filter_seconds: float
+    scoring_seconds: float
+    candidates_before: Optional[int]
+    candidates_after: Optional[int]
+    fallback: bool
+    cache_hits: int
+    cache_misses: int
+    prescreen_audits: int
+    prescreen_misses: int
+
+
+class SessionRecord(NamedTuple):
+    target: Optional[str]
+    n_guesses: int
+    seconds: float
+
+
+class SolverInstrumentation:
+    # the no-op default; the solve loop and the solvers report to it, implementations decide what to keep
+
+    def record_fallback(self):
+        pass
+
+    def record_cache_lookup(self, hit: bool):
+        pass
+
+    def record_prescreen(self, missed: bool):
+        pass
+
+    def record_turn(self, turn: int, filter_seconds: float, scoring_seconds: float,
+                    candidates_before: Optional[int], candidates_after: Optional[int]):
+        pass
+
+    def record_session(self, session: WordleSessionEngine, n_guesses: int, seconds: float):
+        pass
+
+
+NULL_INSTRUMENTATION = SolverInstrumentation()
+
+
+class InMemoryInstrumentation(SolverInstrumentation):
+    # keeps every turn and session record. fallback and cache events are attached to the turn being ranked
+
+    def __init__(self):
+        self.turns: List[TurnRecord] = []
+        self.sessions: List[SessionRecord] = []
+        self.__fallback = False
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__prescreen_audits = 0
+        self.__prescreen_misses = 0
+
+    def record_fallback(self):
+        self.__fallback = True
+
+    def record_cache_lookup(self, hit: bool):
+        if hit:
+            self.__cache_hits += 1
+        else:
+            self.__cache_misses += 1
+
+    def record_prescreen(self, missed: bool):
+        self.__prescreen_audits += 1
+        self.__prescreen_misses += missed
+
+    def record_turn(self, turn: int, filter_seconds: float, scoring_seconds: float,
+                    candidates_before: Optional[int], candidates_after: Optional[int]):
+        self.turns.append(TurnRecord(turn, filter_seconds, scoring_seconds, candidates_before, candidates_after,
+                                     self.__fallback, self.__cache_hits, self.__cache_misses,
+                                     self.__prescreen_audits, self.__prescreen_misses))
+        self.__fallback = False
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__prescreen_audits = 0
+        self.__prescreen_misses = 0
+
+    def record_session(self, session: WordleSessionEngine, n_guesses: int, seconds: float):
+        self.sessions.append(SessionRecord(getattr(session, "target", None), n_guesses, seconds))
+
+    def slowest_sessions(self, n: int = 10) -> List[SessionRecord]:
+        return sorted(self.sessions, key=attrgetter("seconds"), reverse=True)[:n]
+
+    def summary(self) -> Dict[int, Dict[str, float]]:
+        # aggregates of the turns by their index in the session
+        turns_by_index: Dict[int, List[TurnRecord]] = defaultdict(list)
+        for record in self.turns:
+            turns_by_index[record.turn].append(record)
+
+        return {turn: summarize_turns(records) for turn, records in sorted(turns_by_index.items())}
+
+
+def summarize_turns(records: List[TurnRecord]) -> Dict[str, float]:
+    n_records = len(records)
+    sizes_before = [r.candidates_before for r in records if r.candidates_before is not None]
+    sizes_after = [r.candidates_after for r in records if r.candidates_after is not None]
+    cache_lookups = sum(r.cache_hits + r.cache_misses for r in records)
+    prescreen_audits = sum(r.prescreen_audits for r in records)
+    return {
+        "count": n_records,
+        "filter_ms": 1000 * sum(r.filter_seconds for r in records) / n_records,
+        "scoring_ms": 1000 * sum(r.scoring_seconds for r in records) / n_records,
+        "candidates_before": (sum(sizes_before) / len(sizes_before)) if sizes_before else float("nan"),
+        "candidates_after": (sum(sizes_after) / len(sizes_after)) if sizes_after else float("nan"),
+        "fallback_rate": sum(r.fallback for r in records) / n_records,
+        "cache_hit_rate": (sum(r.cache_hits for r in records) / cache_lookups) if cache_lookups else float("nan"),
+        # the rate of the audited fallback rankings whose single stage pick was not pre-screened
+        "prescreen_miss_rate": ((sum(r.prescreen_misses for r in records) / prescreen_audits) if prescreen_audits
+                                else float("nan")),
+    }
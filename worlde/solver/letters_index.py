@@ -0,0 +1,81 @@
+from typing import List, Optional
+
+import numpy as np
+
+from engine.feedback import ALPHABET_SIZE, encode_words, count_letters
+from solver.constraints import CompiledConstraints, Constraints, MAX_LETTER_COUNT
+
+
+class LettersIndex:
+    # an inverted index of the words, as bitsets packed 8 words to a byte:
+    #   position_bitsets[position, letter] - the words with the letter in the position
+    #   count_bitsets[letter, count] - the words with at least `count` occurrences of the letter
+    # the words satisfying compiled constraints are then found by a few bitsets intersections
+
+    def __init__(self, words: List[str], position_bitsets: np.ndarray, count_bitsets: np.ndarray):
+        self.words = words
+        self.position_bitsets = position_bitsets
+        self.count_bitsets = count_bitsets
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def word_len(self) -> int:
+        return self.position_bitsets.shape[0]
+
+    def bitset(self, compiled: CompiledConstraints) -> np.ndarray:
+        bits = self.count_bitsets[0, 0].copy()
+        for position, allowed in enumerate(compiled.allowed_letters):
+            if allowed.all():
+                continue
+
+            allowed_letters = np.flatnonzero(allowed)
+            if len(allowed_letters) == 1:
+                bits &= self.position_bitsets[position, allowed_letters[0]]
+                continue
+
+            for letter in np.flatnonzero(~allowed):
+                bits &= ~self.position_bitsets[position, letter]
+
+        max_count = self.count_bitsets.shape[1] - 1
+        for letter in np.flatnonzero(compiled.min_counts):
+            min_count = int(compiled.min_counts[letter])
+            if min_count > max_count:
+                bits[:] = 0
+                break
+            bits &= self.count_bitsets[letter, min_count]
+
+        for letter in np.flatnonzero(compiled.max_counts < MAX_LETTER_COUNT):
+            exceeding_count = int(compiled.max_counts[letter]) + 1
+            if exceeding_count <= max_count:
+                bits &= ~self.count_bitsets[letter, exceeding_count]
+
+        return bits
+
+    def indices(self, compiled: CompiledConstraints) -> np.ndarray:
+        return np.flatnonzero(np.unpackbits(self.bitset(compiled), count=len(self.words)))
+
+    def select_indices(self, constraints: Constraints) -> np.ndarray:
+        return self.indices(constraints.compile(self.word_len))
+
+    def select_words(self, constraints: Constraints) -> List[str]:
+        return [self.words[i] for i in self.select_indices(constraints).tolist()]
+
+    @staticmethod
+    def create(words: List[str], encoded_words: Optional[np.ndarray] = None) -> 'LettersIndex':
+        if encoded_words is None:
+            encoded_words = encode_words(words)
+
+        n_words, word_len = encoded_words.shape
+        letters = np.arange(ALPHABET_SIZE, dtype=encoded_words.dtype)
+        # (position, letter, word) -> packed along the words
+        in_position = encoded_words.T[:, None, :] == letters[None, :, None]
+        position_bitsets = np.packbits(in_position, axis=-1)
+
+        letters_counts = count_letters(encoded_words).T
+        counts = np.arange(word_len + 1)
+        # (letter, count, word)
+        at_least = letters_counts[:, None, :] >= counts[None, :, None]
+        count_bitsets = np.packbits(at_least, axis=-1)
+        return LettersIndex(words, position_bitsets, count_bitsets)
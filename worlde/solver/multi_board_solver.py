@@ -0,0 +1,82 @@
+import time
+from itertools import islice
+from typing import List, Optional, Sequence
+
+from engine.multi_board_engine import MultiBoardSession, MultiBoardFeedback
+from engine.pattern_matrix import PatternMatrix
+from solver.candidates import CandidateSet
+from solver.entropy.partition_entropy import rank_by_joint_partition_entropy
+from solver.entropy.ranking import LazyRanking
+from solver.instrumentation import SolverInstrumentation, NULL_INSTRUMENTATION
+
+
+class MultiBoardSolver:
+    # ranks the guesses by their joint expected information over the unsolved boards (see
+    # `rank_by_joint_partition_entropy`), a board left with a single candidate is solved first
+
+    def __init__(self, patterns: PatternMatrix, instrumentation: Optional[SolverInstrumentation] = None):
+        self.patterns = patterns
+        self.instrumentation = instrumentation or NULL_INSTRUMENTATION
+        self.initial_candidates = CandidateSet.from_patterns(patterns)
+        # every board has the same candidates on the first turn, so the opening ranking does not depend on the session
+        self.__initial_ranking: Optional[LazyRanking] = None
+
+    def rank_guesses(self, boards_candidates: Sequence[Optional[CandidateSet]]) -> LazyRanking:
+        # the candidates of the solved boards are None
+        unsolved = [candidates for candidates in boards_candidates if candidates is not None]
+        if all(candidates is self.initial_candidates for candidates in unsolved):
+            if self.__initial_ranking is None:
+                initial_boards = [self.initial_candidates.indices]
+                self.__initial_ranking = rank_by_joint_partition_entropy(self.patterns, initial_boards)
+            return self.__initial_ranking
+
+        return rank_by_joint_partition_entropy(self.patterns, [candidates.indices for candidates in unsolved])
+
+    def next_guess(self, boards_candidates: Sequence[Optional[CandidateSet]]) -> str:
+        for candidates in boards_candidates:
+            if (candidates is not None) and (len(candidates) == 1):
+                return candidates.words()[0]
+
+        return next(iter(self.rank_guesses(boards_candidates)))
+
+    def suggest(self, boards_candidates: Sequence[Optional[CandidateSet]], n_suggestions: int) -> List[str]:
+        return list(islice(self.rank_guesses(boards_candidates), n_suggestions))
+
+    def create_candidates(self, n_boards: int) -> List[Optional[CandidateSet]]:
+        return [self.initial_candidates] * n_boards
+
+    def update_candidates(self, boards_candidates: List[Optional[CandidateSet]],
+                          feedback: MultiBoardFeedback) -> List[Optional[CandidateSet]]:
+        updated_candidates = []
+        for candidates, board_feedback in zip(boards_candidates, feedback.boards):
+            if (board_feedback is None) or board_feedback.is_solved() or (candidates is None):
+                updated_candidates.append(None)
+                continue
+
+            updated_candidates.append(candidates.narrow(feedback.word, board_feedback.pattern))
+
+        return updated_candidates
+
+    def solve(self, session: MultiBoardSession) -> int:
+        session_start = time.perf_counter()
+        boards_candidates = self.create_candidates(session.n_boards)
+        n_guesses = 0
+        # a session which raises (e.g. exceeds the max tries) is recorded as well
+        try:
+            while not session.is_solved():
+                n_guesses += 1
+                scoring_start = time.perf_counter()
+                guess = self.next_guess(boards_candidates)
+                scoring_seconds = time.perf_counter() - scoring_start
+
+                feedback = session.guess(guess)
+                filter_start = time.perf_counter()
+                candidates_before = sum(len(candidates) for candidates in boards_candidates if candidates is not None)
+                boards_candidates = self.update_candidates(boards_candidates, feedback)
+                candidates_after = sum(len(candidates) for candidates in boards_candidates if candidates is not None)
+                self.instrumentation.record_turn(n_guesses, time.perf_counter() - filter_start, scoring_seconds,
+                                                 candidates_before, candidates_after)
+        finally:
+            self.instrumentation.record_session(session, n_guesses, time.perf_counter() - session_start)
+
+        return n_guesses
@@ -1,8 +1,7 @@
 import random
 from typing import List, Iterator
 
-from solver.constraints import Constraints
-from solver.wordle_solver import WordleSolver
+from solver.wordle_solver import WordleSolver, SolverContext
 
 
 class NaiveSolver(WordleSolver):
@@ -11,10 +10,10 @@ class NaiveSolver(WordleSolver):
         self.allowed_words = allowed_words
         self.random = random.Random(seed)
 
-    def iter_first_guesses(self) -> Iterator[str]:
+    def iter_first_guesses(self, context: SolverContext) -> Iterator[str]:
         indices = list(range(len(self.allowed_words)))
         self.random.shuffle(indices)
         yield from iter(map(self.allowed_words.__getitem__, indices))
 
-    def iter_guesses(self, current_guesses: Iterator[str], constraints: Constraints) -> Iterator[str]:
-        return constraints.filter_words(current_guesses)
+    def iter_guesses(self, context: SolverContext) -> Iterator[str]:
+        return context.constraints.filter_words(context.guesses_iter)
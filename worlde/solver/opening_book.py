@@ -0,0 +1,88 @@
+import json
+from typing import NamedTuple, Dict, Optional, Iterable, Tuple, List
+
+from engine.feedback import create_feedback_pattern
+
+
+class BookNode(NamedTuple):
+    # the guess to play in this state, and the next state for every feedback pattern it got
+    guess: str
+    children: Dict[int, 'BookNode']
+
+    def next(self, guess: str, pattern: int) -> Optional['BookNode']:
+        if guess != self.guess:
+            return None
+
+        return self.children.get(pattern)
+
+    def to_json(self) -> list:
+        if len(self.children) == 0:
+            return [self.guess]
+
+        return [self.guess, {str(pattern): child.to_json() for pattern, child in self.children.items()}]
+
+    @staticmethod
+    def from_json(raw: list) -> 'BookNode':
+        children = raw[1] if len(raw) > 1 else {}
+        return BookNode(raw[0], {int(pattern): BookNode.from_json(child) for pattern, child in children.items()})
+
+
+class OpeningBook(NamedTuple):
+    # the decision tree (feedback history -> next guess) of a deterministic solver configuration, which `config`
+    # describes (see `SimplifiedEntropySolver.ranking_config`)
+    root: BookNode
+    config: str = ""
+
+    def lookup(self, history: Iterable[Tuple[str, int]]) -> Optional[str]:
+        node = self.root
+        for guess, pattern in history:
+            node = node.next(guess, pattern)
+            if node is None:
+                return None
+
+        return node.guess
+
+    def count_nodes(self) -> int:
+        count = 0
+        nodes = [self.root]
+        while len(nodes) > 0:
+            node = nodes.pop()
+            count += 1
+            nodes.extend(node.children.values())
+
+        return count
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({"config": self.config, "tree": self.root.to_json()}, f, separators=(',', ':'))
+
+    @staticmethod
+    def load(path: str) -> 'OpeningBook':
+        with open(path, 'r') as f:
+            raw = json.load(f)
+
+        return OpeningBook(BookNode.from_json(raw["tree"]), raw.get("config", ""))
+
+
+def build_opening_book(sessions_guesses: Iterable[Tuple[str, List[str]]], config: str = "") -> OpeningBook:
+    # `sessions_guesses` holds the target and the guesses the solver played for it, for every target
+    root: Optional[BookNode] = None
+    for target, guesses in sessions_guesses:
+        if root is None:
+            root = BookNode(guesses[0], {})
+
+        node = root
+        for guess, next_guess in zip(guesses, guesses[1:]):
+            if node.guess != guess:
+                raise ValueError(f"The solver is not deterministic: played {guess} instead of {node.guess} ({target})")
+
+            pattern = create_feedback_pattern(guess, target)
+            node = node.children.setdefault(pattern, BookNode(next_guess, {}))
+
+        if node.guess != guesses[-1]:
+            raise ValueError(f"The solver is not deterministic: played {guesses[-1]} instead of {node.guess} ({target})")
+
+    if root is None:
+        raise ValueError("Cannot build an opening book without sessions")
+
+    return OpeningBook(root, config)
@@ -0,0 +1,93 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Hashable, Optional
+
+from solver.entropy.ranking import LazyRanking
+
+DEFAULT_MAX_SIZE = 4096
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return (self.hits / total) if total > 0 else 0.
+
+
+class RankingCache:
+    # a bounded LRU cache of ranked guesses, shared across sessions (and threads) and keyed by a canonical form of
+    # the game state
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.__entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_RankingCache__lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[LazyRanking]:
+        with self.__lock:
+            ranked_guesses = self.__entries.get(key)
+            if ranked_guesses is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return ranked_guesses
+
+    def put(self, key: Hashable, ranked_guesses: LazyRanking):
+        with self.__lock:
+            self.__entries[key] = ranked_guesses
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self.__entries))
+
+    def save(self, path: str, config: str = ""):
+        # `config` describes what the rankings depend on (solver options, words), a saved cache is loaded only
+        # with the same one
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with self.__lock:
+            entries = list(self.__entries.items())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"config": config, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str, config: str = ""):
+        # adds the entries saved at `path`, if it exists
+        if not os.path.exists(path):
+            return
+
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+        if saved["config"] != config:
+            raise ValueError(f"The ranking cache {path} was saved for '{saved['config']}', not for '{config}'")
+
+        for key, ranked_guesses in saved["entries"]:
+            self.put(key, ranked_guesses)
+        with self.__lock:
+            self.evictions = 0
@@ -1,15 +1,39 @@
+from enum import Enum
+from itertools import chain
 from math import log2
 from operator import itemgetter
-from typing import Iterator, List, Tuple
+from typing import Iterator, List, Tuple, Dict, Optional, Iterable, Sized
 
-from engine.wordle_engine import WordleSessionEngine
+import numpy as np
+
+from engine.pattern_matrix import PatternMatrix, compute_words_lists_hash
+from engine.wordle_engine import GuessFeedback
+from solver.candidates import CandidateSet
 from solver.constraints import Constraints
-from solver.entropy.letters_stats import sort_by_info_gain
-from solver.wordle_solver import WordleSolver
+from solver.endgame_solver import EndgameSolver, EndgameObjective
+from solver.entropy.lookahead_search import LookaheadSearch
+from solver.entropy.letters_stats import sort_by_info_gain, rank_by_info_gain
+from solver.entropy.partition_entropy import sort_by_partition_entropy, rank_by_partition_entropy
+from solver.entropy.ranking import LazyRanking
+from solver.entropy.two_stage_ranking import TwoStageRanker
+from solver.instrumentation import SolverInstrumentation
+from solver.letters_index import LettersIndex
+from solver.opening_book import OpeningBook, BookNode
+from solver.ranking_cache import RankingCache
+from solver.wordle_solver import WordleSolver, SolverContext
 
 DEFAULT_MIN_INFORMATION_GAIN_DIFF = 0.5
 
 
+class RankingMode(Enum):
+    # per-letter independence approximation of the information gain
+    LETTERS_HEURISTIC = "heuristic"
+    # the exact expected information, computed from the feedback patterns partition of the candidates
+    PARTITION_ENTROPY = "exact"
+    # the exact ranking, with the guess of a time-bounded search of the minimal expected number of guesses first
+    LOOKAHEAD = "lookahead"
+
+
 def max_entropy(n: int) -> float:
     return -log2(1. / n)
 
@@ -30,40 +54,237 @@ def has_information_gain(
     return (max_entropy - min_entropy) > min_gain_diff
 
 
+class EntropySolverContext(SolverContext):
+    # the opening book position of the session, None once the session left the book
+    __slots__ = ("book_node",)
+
+    def __init__(self, constraints: Constraints, candidates: Optional[CandidateSet]):
+        super().__init__(constraints, candidates)
+        self.book_node: Optional[BookNode] = None
+
+
 class SimplifiedEntropySolver(WordleSolver):
+    context_class = EntropySolverContext
+
+    def __init__(self, allowed_guesses: List[str], max_guesses: int, patterns: Optional[PatternMatrix] = None,
+                 ranking_mode: RankingMode = RankingMode.LETTERS_HEURISTIC, answers_weights: Dict[str, float] = None,
+                 book: Optional[OpeningBook] = None, ranking_cache: Optional[RankingCache] = None,
+                 instrumentation: Optional[SolverInstrumentation] = None,
+                 lookahead: Optional[LookaheadSearch] = None, hard_mode: bool = False,
+                 prescreen_k: Optional[int] = None, prescreen_audit: bool = False,
+                 endgame_threshold: Optional[int] = None,
+                 endgame_objective: EndgameObjective = EndgameObjective.EXPECTED,
+                 encoded_guesses: Optional[np.ndarray] = None):
+        # `encoded_guesses` may be given to share the already encoded allowed guesses, e.g. of a memory-mapped corpus
+        if (ranking_mode is not RankingMode.LETTERS_HEURISTIC) and (patterns is None):
+            raise ValueError(f"Ranking mode {ranking_mode.value} requires a patterns matrix")
+        if hard_mode and (ranking_mode is RankingMode.LOOKAHEAD):
+            raise ValueError(f"Ranking mode {ranking_mode.value} does not support hard mode")
+        if (prescreen_k is not None) and (ranking_mode is not RankingMode.LETTERS_HEURISTIC):
+            # the pre-screen applies to the dictionary fallback of the letters heuristic only
+            raise ValueError(f"Ranking mode {ranking_mode.value} does not support the pre-screen")
+        if hard_mode and (endgame_threshold is not None):
+            raise ValueError("The endgame search does not support hard mode")
 
-    def __init__(self, allowed_guesses: List[str], max_guesses: int):
         self.allowed_guesses = allowed_guesses
-        self.n_guesses = 0
         self.max_guesses = max_guesses
-        self.initial_sorted_guesses = sort_by_info_gain(allowed_guesses)
+        self.patterns = patterns
+        self.ranking_mode = ranking_mode
+        self.book = book
+        self.ranking_cache = ranking_cache
+        if instrumentation is not None:
+            self.instrumentation = instrumentation
+        self.answers_weights: Optional[np.ndarray] = None
+        if (patterns is not None) and (answers_weights is not None):
+            self.answers_weights = np.array([answers_weights.get(word, 0) for word in patterns.answers])
+
+        self.hard_mode = hard_mode
+        self.letters_index: Optional[LettersIndex] = None
+        if hard_mode:
+            # the index of the guesses the ranking mode ranks
+            ranked_guesses = allowed_guesses if (ranking_mode is RankingMode.LETTERS_HEURISTIC) else patterns.guesses
+            self.letters_index = LettersIndex.create(ranked_guesses)
+
+        # the dictionary fallback ranks only the top `prescreen_k` guesses of a cheap pre-screen. the audit ranks all
+        # of them as well, to report whether the pick was pre-screened
+        self.two_stage_ranker = None if prescreen_k is None else TwoStageRanker(allowed_guesses, prescreen_k)
+        self.prescreen_audit = prescreen_audit
+
+        self.lookahead = None
+        if ranking_mode is RankingMode.LOOKAHEAD:
+            self.lookahead = lookahead or LookaheadSearch(patterns)
+
+        self.allowed_guesses_index: Optional[LettersIndex] = None
+        if ranking_mode is not RankingMode.LETTERS_HEURISTIC:
+            # the allowed guesses are filtered when the target is not one of the patterns answers
+            self.allowed_guesses_index = LettersIndex.create(allowed_guesses, encoded_guesses)
+            # the opening guess of the lookahead mode is the entropy one (or the book's), searching it is too costly
+            self.initial_candidates = CandidateSet.from_patterns(patterns)
+            self.initial_sorted_guesses = sort_by_partition_entropy(patterns, self.initial_candidates.indices,
+                                                                    self.answers_weights)
+        else:
+            self.initial_candidates = CandidateSet.create(allowed_guesses, encoded_words=encoded_guesses)
+            self.initial_sorted_guesses = sort_by_info_gain(allowed_guesses)
+
+        if endgame_threshold is not None:
+            # the endgame searches the guesses the ranking mode ranks, with the candidates as equally likely (the
+            # answers weights are ignored). its memo is shared by all the sessions
+            searched_guesses = allowed_guesses if (ranking_mode is RankingMode.LETTERS_HEURISTIC) else patterns.guesses
+            self.endgame = EndgameSolver(searched_guesses, self.initial_candidates, endgame_threshold,
+                                         endgame_objective, patterns=patterns)
+
+        # the answers are those of the patterns, the heuristic mode without patterns plays over the allowed guesses
+        answers = allowed_guesses if patterns is None else patterns.answers
+        self.words_hash = compute_words_lists_hash(allowed_guesses, answers)
+        if (book is not None) and (book.config != self.ranking_config()):
+            raise ValueError(f"The opening book was compiled for '{book.config}', not for '{self.ranking_config()}'")
+
+    def ranking_config(self) -> str:
+        # the options and word lists the guesses depend on. an opening book (or a saved ranking cache) is for a
+        # single configuration
+        config = [self.ranking_mode.value, f"max_guesses={self.max_guesses}"]
+        if self.answers_weights is not None:
+            config.append("weighted")
+        if self.two_stage_ranker is not None:
+            config.append(f"prescreen_k={self.two_stage_ranker.k}")
+        if self.endgame is not None:
+            config.append(f"endgame={self.endgame.threshold}:{self.endgame.objective.value}")
+        config.append(self.words_hash)
+        return ",".join(config)
+
+    def iter_first_guesses(self, context: EntropySolverContext) -> Iterator[str]:
+        guesses = map(itemgetter(0), self.initial_sorted_guesses)
+        if self.book is None:
+            return guesses
+
+        context.book_node = self.book.root
+        return self.__chain_book_guess(context.book_node.guess, guesses)
+
+    def create_candidates(self) -> Optional[CandidateSet]:
+        return self.initial_candidates
+
+    def on_feedback(self, context: EntropySolverContext, feedback: GuessFeedback):
+        if context.book_node is not None:
+            context.book_node = context.book_node.next(feedback.word, feedback.pattern)
+
+    def iter_guesses(self, context: EntropySolverContext) -> Iterator[str]:
+        guesses_iter, constraints, candidates = context.guesses_iter, context.constraints, context.candidates
+        # the number of the guess being ranked
+        n_guesses = context.n_guesses + 1
+        book_node = context.book_node
+        if (book_node is not None) and self.hard_mode and (not self.__is_legal(book_node.guess, constraints)):
+            # the book was compiled without the hard mode rules, the rest of the game is ranked live
+            book_node = context.book_node = None
+
+        if book_node is None:
+            return iter(self.__sort_guesses(guesses_iter, constraints, candidates, n_guesses))
+
+        # the rest of the guesses are ranked live only if more than the book guess is requested
+        live_guesses = self.__iter_sorted_guesses(guesses_iter, constraints, candidates, n_guesses)
+        return self.__chain_book_guess(book_node.guess, live_guesses)
+
+    def __chain_book_guess(self, book_guess: str, guesses: Iterator[str]) -> Iterator[str]:
+        return chain([book_guess], filter(lambda word: word != book_guess, guesses))
+
+    def __iter_sorted_guesses(self, guesses_iter: Iterator[str], constraints: Constraints,
+                              candidates: Optional[CandidateSet], n_guesses: int) -> Iterator[str]:
+        yield from self.__sort_guesses(guesses_iter, constraints, candidates, n_guesses)
+
+    def __sort_guesses(self, guesses_iter: Iterator[str], constraints: Constraints,
+                       candidates: Optional[CandidateSet], n_guesses: int) -> Iterable[str]:
+        if (self.ranking_cache is None) or (candidates is None):
+            return self.__rank_guesses(guesses_iter, constraints, candidates, n_guesses)
+
+        # the letters heuristic falls back to the whole dictionary depending on the turn, the exact ranking does not
+        turn = n_guesses if (self.ranking_mode is RankingMode.LETTERS_HEURISTIC) else None
+        key = (turn, candidates.key())
+        if self.hard_mode:
+            # the legal guesses depend on the revealed hints, not only on the remaining candidates
+            key += (tuple(sorted(constraints.must_exist)), tuple(sorted(constraints.exact_positions)))
+        sorted_guesses = self.ranking_cache.get(key)
+        self.instrumentation.record_cache_lookup(sorted_guesses is not None)
+        if sorted_guesses is None:
+            sorted_guesses = self.__rank_guesses(guesses_iter, constraints, candidates, n_guesses)
+            self.ranking_cache.put(key, sorted_guesses)
+        elif (turn is not None) and self.__might_fail(candidates, n_guesses):
+            # the cached ranking is the dictionary fallback
+            self.instrumentation.record_fallback()
+
+        return sorted_guesses
+
+    def __rank_guesses(self, guesses_iter: Iterator[str], constraints: Constraints,
+                       candidates: Optional[CandidateSet], n_guesses: int) -> Iterable[str]:
+        # the rankings are lazy, only the top guesses are ordered until more of them are requested
+        if self.ranking_mode is not RankingMode.LETTERS_HEURISTIC:
+            candidates_indices = self.__candidates_indices(guesses_iter, constraints, candidates)
+            if len(candidates_indices) > 0:
+                legal_guesses_indices = self.__legal_guesses_indices(constraints) if self.hard_mode else None
+                ranking = rank_by_partition_entropy(self.patterns, candidates_indices, self.answers_weights,
+                                                    legal_guesses_indices)
+                if self.lookahead is not None:
+                    ranking = self.__lookahead_ranking(ranking, candidates_indices)
+                return ranking
+
+            # the target is not one of the possible answers the patterns were computed for
+            guesses_iter = self.allowed_guesses_index.select_words(constraints)
+        elif candidates is not None:
+            guesses_iter = candidates.words()
+        else:
+            guesses_iter = constraints.select_words(guesses_iter)
+
+        if self.__might_fail(guesses_iter, n_guesses):
+            self.instrumentation.record_fallback()
+            legal_guesses_indices = self.__legal_guesses_indices(constraints) if self.hard_mode else None
+            if self.two_stage_ranker is not None:
+                return self.__two_stage_ranking(guesses_iter, legal_guesses_indices)
+
+            allowed_guesses = self.allowed_guesses
+            if legal_guesses_indices is not None:
+                allowed_guesses = [allowed_guesses[i] for i in legal_guesses_indices.tolist()]
+            return rank_by_info_gain(allowed_guesses, guesses_iter)
+
+        return rank_by_info_gain(guesses_iter)
+
+    def __two_stage_ranking(self, remained_words: List[str],
+                            legal_guesses_indices: Optional[np.ndarray]) -> LazyRanking:
+        result = self.two_stage_ranker.rank(remained_words, legal_guesses_indices)
+        if self.prescreen_audit:
+            missed = self.two_stage_ranker.is_prescreen_miss(result, remained_words, legal_guesses_indices)
+            self.instrumentation.record_prescreen(missed)
+
+        return result.ranking
+
+    def __lookahead_ranking(self, ranking: LazyRanking, candidates_indices: np.ndarray) -> LazyRanking:
+        best_guess, _ = self.lookahead.search(candidates_indices)
+        if best_guess not in self.patterns.guesses_index:
+            # the deadline passed before the shallowest search completed
+            return ranking
 
-    def reset(self):
-        self.n_guesses = 0
+        scores = ranking.scores.copy()
+        scores[self.patterns.guesses_index[best_guess]] = np.inf
+        return LazyRanking(ranking.words, scores, ranking.tie_breaker)
 
-    def solve(self, session: WordleSessionEngine) -> int:
-        self.reset()
-        return super().solve(session)
+    def __legal_guesses_indices(self, constraints: Constraints) -> np.ndarray:
+        # the indices of the guesses satisfying the revealed hints, in the indexed (ranked) guesses
+        return self.letters_index.select_indices(constraints.hard_mode())
 
-    def iter_first_guesses(self) -> Iterator[str]:
-        self.n_guesses = 1
-        return iter(map(itemgetter(0), self.initial_sorted_guesses))
+    def __is_legal(self, guess: str, constraints: Constraints) -> bool:
+        return len(constraints.hard_mode().select_words([guess])) > 0
 
-    def iter_guesses(self, guesses_iter: Iterator[str], constraints: Constraints) -> Iterator[str]:
-        self.n_guesses += 1
-        guesses_iter = list(constraints.filter_words(guesses_iter))
-        sorted_guesses = sort_by_info_gain(guesses_iter)
-        if self.__might_fail(guesses_iter, sorted_guesses):
-            print("*", end="")
-            sorted_guesses = sort_by_info_gain(self.allowed_guesses, guesses_iter)
+    def __candidates_indices(self, guesses_iter: Iterator[str], constraints: Constraints,
+                             candidates: Optional[CandidateSet]) -> np.ndarray:
+        if (candidates is not None) and (candidates.patterns is self.patterns):
+            return candidates.indices
 
-        return iter(map(itemgetter(0), sorted_guesses))
+        answers_index = self.patterns.answers_index
+        remained_words = constraints.select_words(guesses_iter)
+        return np.array([answers_index[word] for word in remained_words if word in answers_index], dtype=np.intp)
 
-    def __might_fail(self, remained_words: List[str], guesses_entropies: List[Tuple[str, float]]) -> bool:
+    def __might_fail(self, remained_words: Sized, n_guesses: int) -> bool:
         if len(remained_words) <= 2:
             return False
 
-        if len(remained_words) <= (self.max_guesses - self.n_guesses + 1):
+        if len(remained_words) <= (self.max_guesses - n_guesses + 1):
             return False
 
         return True
@@ -0,0 +1,101 @@
+import os
+import random
+from functools import lru_cache
+from typing import List, Tuple
+
+import pytest
+
+from engine.feedback import create_feedback_pattern
+from engine.pattern_matrix import PatternMatrix
+from engine.wordle_engine import solved_pattern
+from solver.candidates import CandidateSet
+from solver.endgame_solver import EndgameSolver, EndgameObjective
+from utils import load_wordslist
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+
+def create_endgames(n_endgames: int, seed: int) -> List[Tuple[List[str], List[str]]]:
+    # clusters of answers which share most of their letters (the hard endgames), with a few other guesses
+    rng = random.Random(seed)
+    answers = load_wordslist(os.path.join(RESOURCES_DIR, "possible_words.txt"))
+    endgames = []
+    while len(endgames) < n_endgames:
+        base = rng.choice(answers)
+        cluster = [word for word in answers if sum(a == b for a, b in zip(word, base)) >= 3]
+        if len(cluster) < 3:
+            continue
+
+        candidates = rng.sample(cluster, min(len(cluster), rng.randint(3, 10)))
+        guesses = sorted(set(candidates) | set(rng.sample(answers, 20)))
+        endgames.append((candidates, guesses))
+
+    return endgames
+
+
+def brute_force_value(candidates: List[str], guesses: List[str], objective: EndgameObjective,
+                      first_guess: str = None) -> float:
+    # the optimal value of the candidates, by searching every guess without pruning (of `first_guess` if given)
+    solved = solved_pattern(len(candidates[0]))
+
+    def guess_value(guess: str, targets: Tuple[str, ...]) -> float:
+        buckets = {}
+        for target in targets:
+            buckets.setdefault(create_feedback_pattern(guess, target), []).append(target)
+        if (len(buckets) == 1) and (solved not in buckets):
+            return float("inf")
+
+        values = [(len(bucket), 1. if pattern == solved else 1. + search(tuple(bucket)))
+                  for pattern, bucket in buckets.items()]
+        if objective is EndgameObjective.EXPECTED:
+            return sum(size * value for size, value in values) / len(targets)
+        return max(value for _, value in values)
+
+    @lru_cache(maxsize=None)
+    def search(targets: Tuple[str, ...]) -> float:
+        return min(guess_value(guess, targets) for guess in guesses)
+
+    if first_guess is not None:
+        return guess_value(first_guess, tuple(candidates))
+    return search(tuple(candidates))
+
+
+@pytest.mark.parametrize("objective", list(EndgameObjective))
+def test_best_guess_is_optimal(objective: EndgameObjective):
+    for candidates, guesses in create_endgames(40, seed=3):
+        initial_candidates = CandidateSet.create(candidates)
+        endgame = EndgameSolver(guesses, initial_candidates, len(candidates), objective)
+        value, guess = endgame.evaluate(initial_candidates)
+        optimal_value = brute_force_value(candidates, guesses, objective)
+        assert value == pytest.approx(optimal_value)
+        assert brute_force_value(candidates, guesses, objective, guess) == pytest.approx(optimal_value)
+
+
+@pytest.mark.parametrize("objective", list(EndgameObjective))
+def test_matrix_patterns_match_computed_patterns(objective: EndgameObjective):
+    for candidates, guesses in create_endgames(10, seed=5):
+        matrix_candidates = CandidateSet.from_patterns(PatternMatrix.compute(guesses, candidates))
+        computed_candidates = CandidateSet.create(candidates)
+        with_matrix = EndgameSolver(guesses, matrix_candidates, objective=objective)
+        without_matrix = EndgameSolver(guesses, computed_candidates, objective=objective)
+        assert with_matrix.use_matrix and not without_matrix.use_matrix
+        assert with_matrix.best_guess(matrix_candidates) == without_matrix.best_guess(computed_candidates)
+
+
+def test_applies_to_the_narrowed_candidates():
+    candidates, guesses = create_endgames(1, seed=7)[0]
+    initial_candidates = CandidateSet.create(candidates)
+    endgame = EndgameSolver(guesses, initial_candidates)
+    guess = endgame.best_guess(initial_candidates)
+    narrowed = initial_candidates.narrow(guess, create_feedback_pattern(guess, candidates[0]))
+    assert endgame.applies(narrowed)
+    assert endgame.best_guess(narrowed) in guesses
+    # a set of another universe is not searched
+    assert not endgame.applies(CandidateSet.create(list(candidates)))
+
+
+def test_no_guess_solves_the_candidates():
+    # none of the candidates can be guessed, and the only guess does not tell them apart
+    candidates = CandidateSet.create(["abcde", "abcdf"])
+    endgame = EndgameSolver(["zzzzz"], candidates)
+    assert endgame.evaluate(candidates) == (float("inf"), None)
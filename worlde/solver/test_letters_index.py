@@ -0,0 +1,53 @@
+import os
+import random
+from typing import List
+
+import pytest
+
+from engine.feedback import create_feedback
+from solver.constraints import Constraints
+from solver.letters_index import LettersIndex
+from utils import load_wordslist
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+
+def create_random_constraints(words: List[str], rng: random.Random, n_feedbacks: int) -> Constraints:
+    # the constraints of a few feedbacks against a random target
+    constraints = Constraints.create_empty()
+    target = rng.choice(words)
+    for _ in range(n_feedbacks):
+        guess = rng.choice(words)
+        constraints = constraints.update(guess, create_feedback(guess, target).pattern)
+
+    return constraints
+
+
+def test_select_words_of_real_words():
+    rng = random.Random(13)
+    words = load_wordslist(os.path.join(RESOURCES_DIR, "allowed_words.txt"))
+    index = LettersIndex.create(words)
+    for _ in range(30):
+        constraints = create_random_constraints(words, rng, rng.randint(1, 4))
+        assert index.select_words(constraints) == list(constraints.filter_words(words))
+        hard_mode = constraints.hard_mode()
+        assert index.select_words(hard_mode) == list(hard_mode.filter_words(words))
+
+
+@pytest.mark.parametrize("word_len", [3, 5, 6])
+def test_select_words_of_repeated_letters(word_len: int):
+    # a small alphabet, so the min / max letter counts bound most of the words
+    rng = random.Random(word_len)
+    words = sorted({"".join(rng.choice("abcd") for _ in range(word_len)) for _ in range(300)})
+    index = LettersIndex.create(words)
+    for _ in range(100):
+        constraints = create_random_constraints(words, rng, rng.randint(1, 3))
+        assert index.select_words(constraints) == list(constraints.filter_words(words))
+
+
+def test_min_count_beyond_the_word_length():
+    words = ["aab", "abb", "bbb"]
+    index = LettersIndex.create(words)
+    assert index.select_words(Constraints([("b", 4)], [], [], [])) == []
+    assert index.select_words(Constraints([("b", 2)], [("a", 0)], [], [])) == ["bbb"]
+    assert index.select_words(Constraints.create_empty()) == words
@@ -1,29 +1,123 @@
 import abc
-from typing import Iterator
+import copy
+import time
+from itertools import chain
+from typing import Iterator, Optional, Type
 
-from engine.wordle_engine import WordleSessionEngine
+from engine.wordle_engine import WordleSessionEngine, GuessFeedback
+from solver.candidates import CandidateSet
 from solver.constraints import Constraints
+from solver.endgame_solver import EndgameSolver
+from solver.instrumentation import SolverInstrumentation, NULL_INSTRUMENTATION
+
+
+class SolverContext:
+    # the state of a single session. the solvers hold only the state shared by all the sessions (corpus, tables,
+    # caches), so a solver can drive many sessions concurrently, each with its own context.
+    # a shallow copy forks the session (the guesses iterator must be forked separately, e.g. with `itertools.tee`)
+    __slots__ = ("n_guesses", "guesses_iter", "constraints", "candidates")
+
+    def __init__(self, constraints: Constraints, candidates: Optional[CandidateSet]):
+        # the number of guesses taken so far
+        self.n_guesses = 0
+        self.guesses_iter: Optional[Iterator[str]] = None
+        self.constraints = constraints
+        self.candidates = candidates
 
 
 class WordleSolver(abc.ABC):
+    instrumentation: SolverInstrumentation = NULL_INSTRUMENTATION
+    context_class: Type[SolverContext] = SolverContext
+    # the exact search of the guess, once few candidates remain
+    endgame: Optional[EndgameSolver] = None
 
     @abc.abstractmethod
-    def iter_first_guesses(self) -> Iterator[str]:
+    def iter_first_guesses(self, context: SolverContext) -> Iterator[str]:
         pass
 
     @abc.abstractmethod
-    def iter_guesses(self, guesses_iter: Iterator[str], constraints: Constraints) -> Iterator[str]:
+    def iter_guesses(self, context: SolverContext) -> Iterator[str]:
+        # the next guesses, given the guesses iterator, constraints and candidates of the context
+        pass
+
+    def create_candidates(self) -> Optional[CandidateSet]:
+        # solvers which track the remaining candidates explicitly return the initial set
+        return None
+
+    def create_context(self) -> SolverContext:
+        context = self.context_class(Constraints.create_empty(), self.create_candidates())
+        context.guesses_iter = self.iter_first_guesses(context)
+        return context
+
+    def on_feedback(self, context: SolverContext, feedback: GuessFeedback):
         pass
 
+    def update_context(self, context: SolverContext, guess: str, feedback: GuessFeedback):
+        # the constraints and candidates are narrowed before the context changes, so a feedback which fails to apply
+        # leaves the context as it was
+        constraints, candidates = context.constraints, context.candidates
+        if not feedback.is_solved():
+            constraints = constraints.update(guess, feedback.pattern)
+            if candidates is not None:
+                candidates = candidates.narrow(guess, feedback.pattern)
+
+        context.n_guesses += 1
+        self.on_feedback(context, feedback)
+        context.constraints, context.candidates = constraints, candidates
+
+    def next_guesses(self, context: SolverContext) -> Iterator[str]:
+        # the guesses of `iter_guesses`, after the endgame guess if the endgame applies to the candidates
+        endgame = self.endgame
+        endgame_guess = None
+        if (endgame is not None) and endgame.applies(context.candidates):
+            endgame_guess = endgame.best_guess(context.candidates)
+        if endgame_guess is None:
+            return self.iter_guesses(context)
+
+        # the rest of the guesses are ranked only if more than the endgame guess is requested. the context is updated
+        # by then, so they are ranked from a copy of it
+        ranked_guesses = self.__iter_ranked_guesses(copy.copy(context))
+        return chain([endgame_guess], filter(lambda word: word != endgame_guess, ranked_guesses))
+
+    def __iter_ranked_guesses(self, context: SolverContext) -> Iterator[str]:
+        yield from self.iter_guesses(context)
+
+    def advance(self, context: SolverContext, guess: str, feedback: GuessFeedback):
+        # the feedback of the guess, and the next guesses unless it solved the session
+        self.update_context(context, guess, feedback)
+        if not feedback.is_solved():
+            context.guesses_iter = self.next_guesses(context)
+
     def solve(self, session: WordleSessionEngine) -> int:
-        guesses_it = self.iter_first_guesses()
-        n_guesses = 0
-        constraints = Constraints.create_empty()
-        while not session.is_solved():
-            n_guesses += 1
-            next_word = next(guesses_it)
-            feedback = session.guess(next_word)
-            constraints = constraints.update(next_word, feedback.labels)
-            guesses_it = self.iter_guesses(guesses_it, constraints)
-
-        return n_guesses
+        instrumentation = self.instrumentation
+        session_start = time.perf_counter()
+        context = self.create_context()
+        # the rankings may be lazy, so the scoring of a turn ends only when the next guess is taken
+        pending_turn = None
+        # a session which raises (e.g. exceeds the max tries) is recorded as well
+        try:
+            while not session.is_solved():
+                scoring_start = time.perf_counter()
+                next_word = next(context.guesses_iter)
+                if pending_turn is not None:
+                    turn, filter_seconds, scoring_seconds, candidates_before, candidates_after = pending_turn
+                    scoring_seconds += time.perf_counter() - scoring_start
+                    instrumentation.record_turn(turn, filter_seconds, scoring_seconds, candidates_before,
+                                                candidates_after)
+
+                feedback = session.guess(next_word)
+                filter_start = time.perf_counter()
+                candidates_before = None if context.candidates is None else len(context.candidates)
+                self.update_context(context, next_word, feedback)
+                if session.is_solved():
+                    break
+
+                candidates_after = None if context.candidates is None else len(context.candidates)
+                scoring_start = time.perf_counter()
+                context.guesses_iter = self.next_guesses(context)
+                pending_turn = (context.n_guesses, scoring_start - filter_start, time.perf_counter() - scoring_start,
+                                candidates_before, candidates_after)
+        finally:
+            instrumentation.record_session(session, context.n_guesses, time.perf_counter() - session_start)
+
+        return context.n_guesses
@@ -1,3 +1,4 @@
+import argparse
 import json
 from enum import Enum
 from operator import itemgetter
@@ -6,16 +7,27 @@ from typing import List, Iterable, Tuple, Dict
 import numpy as np
 
 
-def load_words(path: str) -> Iterable[str]:
+DEFAULT_WORD_LEN = 5
+
+
+def load_words(path: str, word_len: int = DEFAULT_WORD_LEN) -> Iterable[str]:
     with open(path, 'r') as f:
         words = map(str.strip, f)
-        words = filter(lambda w: len(w) == 5, words)
+        words = filter(lambda w: len(w) == word_len, words)
         words = filter(lambda w: all(map(str.isalpha, w)), words)
         yield from words
 
 
-def load_wordslist(path: str) -> List[str]:
-    return list(load_words(path))
+def load_wordslist(path: str, word_len: int = DEFAULT_WORD_LEN) -> List[str]:
+    return list(load_words(path, word_len))
+
+
+def positive_int(value: str) -> int:
+    # an argparse type
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive integer")
+    return number
 
 
 def load_freqs(path: str) -> List[Tuple[str, float]]:
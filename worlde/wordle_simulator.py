@@ -58,8 +58,8 @@ if __name__ == "__main__":
                 print(f"Solved! (in {len(guesses)} tries)")
                 break
 
-            # constraints.update(word, feedback.labels)
-            constraints = Constraints.create(word, feedback.labels)
+            # constraints.update(word, feedback.pattern)
+            constraints = Constraints.create(word, feedback.pattern)
             remained_words = list(constraints.filter_words(remained_words))
             sorted_allowed_guesses = get_sorted_words(remained_words, weights=guesses_weights)
             if (len(remained_words) > 2) and (len(guesses) < 5) and (not has_information_gain(remained_words, sorted_allowed_guesses)):